@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+import argparse
+import csv
+import io
+import logging
+import os
+import sqlite3
+import time
+
+import config
+from reconcile import normalize_vehicle_number, parse_form_time, parse_ticket_time
+
+logger = logging.getLogger(__name__)
+
+# Analytics settings (override in config.py)
+ANALYTICS_DB_PATH = getattr(config, 'ANALYTICS_DB_PATH', 'analytics.db')
+FORM_CSV_PATH = getattr(config, 'FORM_CSV_PATH', 'processed_entries.csv')  # sheets_api.py export, not the sequencer's tracking CSV
+TICKETS_CSV_PATH = getattr(config, 'TICKETS_CSV_PATH', 'extracted_data.csv')
+EMAILS_CSV_PATH = getattr(config, 'EMAILS_CSV_PATH', 'emails.csv')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ingest_state (
+    source TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    header TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    mtime REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    day TEXT,
+    time TEXT,
+    entry_no TEXT,
+    material TEXT,
+    party TEXT,
+    gross_or_tare TEXT,
+    vehicle_type TEXT,
+    vehicle_number TEXT,
+    cost REAL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_day ON entries (day);
+CREATE INDEX IF NOT EXISTS idx_entries_material_day ON entries (material, day);
+CREATE INDEX IF NOT EXISTS idx_entries_party_day ON entries (party, day);
+CREATE INDEX IF NOT EXISTS idx_entries_vehicle_type_day ON entries (vehicle_type, day);
+CREATE TABLE IF NOT EXISTS tickets (
+    sn INTEGER PRIMARY KEY,
+    day TEXT,
+    time TEXT,
+    vehicle_number TEXT,
+    vehicle_type TEXT,
+    party TEXT,
+    material TEXT,
+    charge REAL,
+    gross_weight REAL,
+    tare_weight REAL,
+    net_weight REAL
+);
+CREATE INDEX IF NOT EXISTS idx_tickets_day ON tickets (day);
+CREATE INDEX IF NOT EXISTS idx_tickets_material_day ON tickets (material, day);
+CREATE INDEX IF NOT EXISTS idx_tickets_party_day ON tickets (party, day);
+CREATE INDEX IF NOT EXISTS idx_tickets_vehicle_type_day ON tickets (vehicle_type, day);
+CREATE INDEX IF NOT EXISTS idx_tickets_vehicle_number ON tickets (vehicle_number);
+CREATE TABLE IF NOT EXISTS emails (
+    id INTEGER PRIMARY KEY,
+    date TEXT,
+    sender TEXT,
+    subject TEXT,
+    body TEXT
+);
+"""
+
+# Columns that reports can group by
+GROUP_COLUMNS = ('material', 'party', 'vehicle_type', 'vehicle_number')
+
+def connect(db_path=None):
+    """Open the analytics database, creating tables and indexes if needed"""
+    conn = sqlite3.connect(db_path or ANALYTICS_DB_PATH)
+    conn.executescript(SCHEMA)
+    return conn
+
+def to_number(value):
+    """Convert a CSV cell to a float, or None if it is blank or not numeric"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def entry_record(row):
+    """Convert a processed_entries.csv row into an entries table record"""
+    dt = parse_form_time(row)
+    return (
+        dt.date().isoformat() if dt else row.get('Date', ''),
+        dt.time().isoformat() if dt else row.get('Time', ''),
+        row.get('1st entry or 2nd entry', ''),
+        row.get('Material', '').strip(),
+        row.get('Party Ref:', '').strip(),
+        row.get('Gross or Tare', ''),
+        row.get('Vehicle Type', '').strip(),
+        normalize_vehicle_number(row.get('Vehicle Number', '')),
+        to_number(row.get('Cost')),
+    )
+
+def ticket_record(row):
+    """Convert an extracted_data.csv row into a tickets table record"""
+    dt = parse_ticket_time(row)
+    return (
+        int(row['S.N']),
+        dt.date().isoformat() if dt else '',
+        dt.time().isoformat() if dt else '',
+        normalize_vehicle_number(row.get('Vehicle Number (V.N)', '')),
+        row.get('Vehicle Type (V.T)', '').strip(),
+        row.get('Party (PRTY)', '').strip(),
+        row.get('Material (MATR)', '').strip(),
+        to_number(row.get('Charge (CHG1)')),
+        to_number(row.get('Gross Weight (G/W)')),
+        to_number(row.get('Tare Weight (T/W)')),
+        to_number(row.get('Net Weight (N/W)')),
+    )
+
+def email_record(row):
+    """Convert an emails.csv row into an emails table record"""
+    return (row.get('Date', ''), row.get('From', ''), row.get('Subject', ''), row.get('Body', ''))
+
+# source name -> (table, insert statement, row converter, append-only file)
+# eml_extractor.py and emailscraper.py rewrite their CSVs, so those are reloaded when they change
+SOURCES = {
+    'entries': (
+        'entries',
+        'INSERT INTO entries (day, time, entry_no, material, party, gross_or_tare, vehicle_type,'
+        ' vehicle_number, cost) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        entry_record,
+        True,
+    ),
+    'tickets': (
+        'tickets',
+        'INSERT OR REPLACE INTO tickets VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        ticket_record,
+        False,
+    ),
+    'emails': (
+        'emails',
+        'INSERT INTO emails (date, sender, subject, body) VALUES (?, ?, ?, ?)',
+        email_record,
+        False,
+    ),
+}
+
+def ingest_csv(conn, source, path):
+    """Load new rows of a CSV into the store, reading only what was appended since last time"""
+    table, insert_sql, convert, append_only = SOURCES[source]
+    if not os.path.exists(path):
+        print(f"  - {path} not found, skipping {source}")
+        return 0
+
+    stat = os.stat(path)
+    with open(path, 'rb') as f:
+        header = f.readline()
+        state = conn.execute('SELECT header, offset, mtime FROM ingest_state WHERE source = ?',
+                             (source,)).fetchone()
+
+        if state and stat.st_size == state[1] and stat.st_mtime == state[2]:
+            print(f"  - {source}: up to date")
+            return 0
+
+        # Resume from the stored offset only if the file was appended to, otherwise reload it
+        if (append_only and state and state[0] == header.decode('utf-8', errors='replace')
+                and stat.st_size >= state[1]):
+            f.seek(state[1])
+        else:
+            conn.execute(f'DELETE FROM {table}')
+        start = f.tell()
+        data = f.read()
+
+    # Only consume complete lines so a half-written row is picked up on the next run
+    end = data.rfind(b'\n') + 1
+    text = header.decode('utf-8') + data[:end].decode('utf-8')
+    # Short (ragged) rows get '' for missing cells rather than None
+    reader = csv.DictReader(io.StringIO(text, newline=''), restval='')
+
+    records = []
+    for row in reader:
+        try:
+            records.append(convert(row))
+        except (KeyError, ValueError, TypeError, AttributeError) as e:
+            logger.warning(f"Skipping malformed {source} row: {e}")
+    conn.executemany(insert_sql, records)
+
+    conn.execute('INSERT OR REPLACE INTO ingest_state VALUES (?, ?, ?, ?, ?)',
+                 (source, path, header.decode('utf-8', errors='replace'), start + end, stat.st_mtime))
+    conn.commit()
+    print(f"  - {source}: ingested {len(records)} rows from {path}")
+    return len(records)
+
+def ingest_all(conn, form_csv=None, tickets_csv=None, emails_csv=None):
+    """Ingest all known CSV sources"""
+    print("\nINGESTING CSV DATA")
+    total = 0
+    total += ingest_csv(conn, 'entries', form_csv or FORM_CSV_PATH)
+    total += ingest_csv(conn, 'tickets', tickets_csv or TICKETS_CSV_PATH)
+    total += ingest_csv(conn, 'emails', emails_csv or EMAILS_CSV_PATH)
+    return total
+
+def aggregate(conn, source='tickets', group_by='material', per='day', date_from=None, date_to=None):
+    """Run a grouped aggregate over entries or tickets and return (columns, rows)"""
+    if group_by is not None and group_by not in GROUP_COLUMNS:
+        raise ValueError(f"Cannot group by {group_by!r}")
+
+    keys = []
+    if per == 'day':
+        keys.append('day')
+    elif per == 'month':
+        keys.append('substr(day, 1, 7)')
+    if group_by:
+        keys.append(group_by)
+
+    if source == 'tickets':
+        metrics = ['COUNT(*)', 'SUM(net_weight) / 1000.0', 'SUM(charge)']
+        metric_names = ['entries', 'net_tonnes', 'charges']
+    else:
+        metrics = ['COUNT(*)', 'SUM(cost)']
+        metric_names = ['entries', 'charges']
+
+    sql = f"SELECT {', '.join(keys + metrics)} FROM {source}"
+    conditions = []
+    params = []
+    if date_from:
+        conditions.append('day >= ?')
+        params.append(date_from)
+    if date_to:
+        conditions.append('day <= ?')
+        params.append(date_to)
+    if conditions:
+        sql += ' WHERE ' + ' AND '.join(conditions)
+    if keys:
+        sql += f" GROUP BY {', '.join(keys)} ORDER BY {', '.join(keys)}"
+
+    columns = ([per] if per in ('day', 'month') else []) + ([group_by] if group_by else []) + metric_names
+    return columns, conn.execute(sql, params).fetchall()
+
+def print_table(columns, rows):
+    """Print query results as an aligned table"""
+    cells = [[f"{v:.3f}" if isinstance(v, float) else '' if v is None else str(v) for v in row] for row in rows]
+    widths = [max([len(c)] + [len(r[i]) for r in cells]) for i, c in enumerate(columns)]
+    print('  '.join(c.ljust(w) for c, w in zip(columns, widths)))
+    print('  '.join('-' * w for w in widths))
+    for row in cells:
+        print('  '.join(v.ljust(w) for v, w in zip(row, widths)))
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Analytics store and reports for weighing data")
+    parser.add_argument("--db", default=ANALYTICS_DB_PATH, help="SQLite database path")
+
+    subparsers = parser.add_subparsers(dest="command", help="Command to execute")
+
+    # Ingest command
+    ingest_parser = subparsers.add_parser("ingest", help="Load new CSV rows into the store")
+    ingest_parser.add_argument("--form-csv", default=FORM_CSV_PATH, help="Form entries CSV")
+    ingest_parser.add_argument("--tickets-csv", default=TICKETS_CSV_PATH, help="Weighbridge tickets CSV")
+    ingest_parser.add_argument("--emails-csv", default=EMAILS_CSV_PATH, help="Scraped emails CSV")
+
+    # Report command
+    report_parser = subparsers.add_parser("report", help="Aggregate weighing data")
+    report_parser.add_argument("--source", choices=["tickets", "entries"], default="tickets",
+                               help="Tickets carry weights, entries carry form submissions")
+    report_parser.add_argument("--by", choices=GROUP_COLUMNS + ("none",), default="material",
+                               help="Column to group by")
+    report_parser.add_argument("--per", choices=["day", "month", "all"], default="day", help="Time grouping")
+    report_parser.add_argument("--from", dest="date_from", help="First day (YYYY-MM-DD)")
+    report_parser.add_argument("--to", dest="date_to", help="Last day (YYYY-MM-DD)")
+    report_parser.add_argument("--no-ingest", action="store_true", help="Skip refreshing from the CSVs")
+
+    args = parser.parse_args()
+    conn = connect(args.db)
+
+    if args.command == "ingest":
+        ingest_all(conn, args.form_csv, args.tickets_csv, args.emails_csv)
+    elif args.command == "report":
+        if not args.no_ingest:
+            ingest_all(conn)
+        start = time.perf_counter()
+        columns, rows = aggregate(conn, args.source, None if args.by == "none" else args.by,
+                                  args.per, args.date_from, args.date_to)
+        elapsed = (time.perf_counter() - start) * 1000
+        print()
+        print_table(columns, rows)
+        print(f"\n{len(rows)} rows in {elapsed:.1f} ms")
+    else:
+        parser.print_help()
+    conn.close()
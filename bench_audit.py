@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+import argparse
+import contextlib
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+# Measures the cost of the HID audit log on keyboard_sequence.py's typing path: the same
+# strings are typed to /dev/null with and without the audit log, and the extra time is
+# compared with the typing time at the configured TYPE_DELAY.
+
+TEXT = "1st\tSand\tOzone City Builders\tGross\tTruck\t250\t"
+
+def time_typing(ks, entries):
+    """Seconds spent typing `entries` copies of TEXT, excluding the per-key delay"""
+    start = time.perf_counter()
+    for n in range(entries):
+        ks.audit_begin(f"3/{n % 28 + 1}/2025 10:00:00|Sand|Truck")
+        ks.type_string(TEXT, delay=0)
+        ks.audit_end(True)
+    return time.perf_counter() - start
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the HID audit log overhead")
+    parser.add_argument("--entries", type=int, default=200, help="Entries typed per run")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per scenario")
+    args = parser.parse_args()
+
+    import keyboard_sequence as ks
+    from hid_audit import HIDAuditLog, decode
+
+    ks.logger.setLevel(logging.WARNING)
+    ks.HID_DEVICE_PATH = os.devnull
+    plain, audited = [], []
+    with tempfile.TemporaryDirectory() as directory, \
+            open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        audit = HIDAuditLog(os.path.join(directory, 'audit.bin'), capacity=65536)
+        for _ in range(args.runs):
+            ks.hid_audit = None
+            plain.append(time_typing(ks, args.entries))
+            ks.hid_audit = audit
+            audited.append(time_typing(ks, args.entries))
+        audit.close()
+        # The decoder must get back exactly what was typed
+        decoded = decode(os.path.join(directory, 'audit.bin'))
+        assert decoded[-1]['text'] == TEXT.replace('\t', '<tab>'), decoded[-1]['text']
+
+    reports = args.entries * len(TEXT) * 2  # Key press + release per character
+    plain_s, audited_s = statistics.median(plain), statistics.median(audited)
+    overhead_us = (audited_s - plain_s) / reports * 1e6
+    typing_s = plain_s + args.entries * len(TEXT) * ks.TYPE_DELAY
+    print(f"{args.entries} entries, {reports} HID reports ({args.runs} runs, median):")
+    print(f"  without audit log: {plain_s * 1000:8.1f} ms  ({plain_s / reports * 1e6:.1f} us/report)")
+    print(f"  with audit log:    {audited_s * 1000:8.1f} ms  ({audited_s / reports * 1e6:.1f} us/report)")
+    print(f"  audit overhead:    {overhead_us:.1f} us/report, "
+          f"{100 * (audited_s - plain_s) / typing_s:.2f}% of typing time at TYPE_DELAY={ks.TYPE_DELAY}s")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+import argparse
+import contextlib
+import gc
+import os
+import tracemalloc
+
+from bench_startup import build_sheet
+
+# Compares memory held by fetched and normalized sheet rows: the old per-row dicts (padded
+# copy, then a second dict per processed entry) against compact SheetRow records.
+
+def dict_rows(values):
+    """The previous representation: a padded dict per row, copied again when normalized"""
+    from keyboard_sequence import split_timestamp, split_vehicle_type
+
+    headers = values[0]
+    entries = [dict(zip(headers, row + [''] * (len(headers) - len(row)))) for row in values[1:]]
+    processed = []
+    for entry in entries:
+        processed_entry = entry.copy()
+        processed_entry['Date'], processed_entry['Time'] = split_timestamp(processed_entry['Timestamp'])
+        processed_entry['Cost'], processed_entry['Vehicle Type'] = split_vehicle_type(processed_entry['Vehicle Type'])
+        processed.append(processed_entry)
+    return entries, processed
+
+def compact_rows(values):
+    """The current representation: SheetRow records normalized in place"""
+    import keyboard_sequence as ks
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        return ks.process_sheet_data(ks.rows_from_values(values))
+
+def measure(build, rows):
+    """Memory held by one representation of a fresh sheet"""
+    values = build_sheet(rows)
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    result = build(values)
+    held = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del result
+    return held
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark memory of sheet row representations")
+    parser.add_argument("--rows", type=int, default=20000, help="Rows in the fake sheet")
+    args = parser.parse_args()
+
+    # Import outside the measurements
+    import keyboard_sequence
+    measure(dict_rows, args.rows)
+
+    dict_bytes = measure(dict_rows, args.rows)
+    compact_bytes = measure(compact_rows, args.rows)
+    print(f"Fetched + normalized {args.rows} rows (memory held beyond the API response):")
+    print(f"  dict rows:    {dict_bytes / 1024 / 1024:7.2f} MiB  ({dict_bytes / args.rows:.0f} bytes/row)")
+    print(f"  compact rows: {compact_bytes / 1024 / 1024:7.2f} MiB  ({compact_bytes / args.rows:.0f} bytes/row)")
+    print(f"  reduction:    {100 * (1 - compact_bytes / dict_bytes):.0f}%")
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import types
+
+# Measures time-to-first-keystroke of keyboard_sequence.py: a fresh interpreter imports it,
+# loads the tracking CSV, fetches the sheet over HTTP from a local fake Sheets API (through
+# the real get_sheet_data, requests and the sheet cache) and stops at the first HID report.
+# Configured sleeps (INITIAL_DELAY etc.) are skipped and reported separately.
+
+class FirstKeystroke(BaseException):
+    """Raised by the fake HID device to stop main() at the first report"""
+
+HEADERS = ['Timestamp', '1st entry or 2nd entry', 'Material', 'Party Ref:', 'Gross or Tare',
+           'Save Bill', 'Print', 'Vehicle Type']
+
+def build_sheet(rows):
+    """Build a fake Sheets API 'values' array; every row but the last is already processed"""
+    values = [HEADERS]
+    for i in range(rows + 1):
+        values.append([
+            f"3/{1 + i % 28}/2025 {i % 24}:{i % 60:02d}:{(i // 60) % 60:02d}",
+            '1st', 'Sand', f"Party {i}", 'Gross', 'Y', 'Y', 'Truck 250'
+        ])
+    return values
+
+def child(csv_path, snapshot_path, sheets_url):
+    """Run one cold start in this process and print timings as JSON"""
+    start = time.perf_counter()
+
+    import keyboard_sequence as ks
+    imported = time.perf_counter()
+
+    ks.LOCAL_CSV_PATH = csv_path
+    ks.PROCESSED_SNAPSHOT_PATH = snapshot_path
+    ks.event_publisher = None
+    ks.AUDIT_LOG_PATH = None
+    ks.row_tracker.path = csv_path + '.rows.json'
+    ks.sheet_cache.path = csv_path + '.sheet_cache.json'
+    ks.SHEETS_API_URL = sheets_url
+    ks.time = types.SimpleNamespace(sleep=lambda seconds: None, time=time.time)
+
+    def write_report(report):
+        raise FirstKeystroke()
+    ks.write_report = write_report
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        try:
+            ks.main()
+        except FirstKeystroke:
+            pass
+    first_keystroke = time.perf_counter()
+
+    print(json.dumps({
+        'import_ms': (imported - start) * 1000,
+        'first_keystroke_ms': (first_keystroke - start) * 1000,
+        'requests_imported': 'requests' in sys.modules,
+        'sqlite3_imported': 'sqlite3' in sys.modules,
+        'initial_delay': ks.INITIAL_DELAY,
+    }))
+
+def prepare(directory, rows):
+    """Write a tracking CSV marking all but the last fake sheet row as processed"""
+    import keyboard_sequence as ks
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        processed = ks.process_sheet_data(ks.rows_from_values(build_sheet(rows)))[:-1]
+        ids = [ks.generate_entry_id(entry) for entry in processed]
+
+    csv_path = os.path.join(directory, 'processed.csv')
+    with open(csv_path, 'w', newline='') as f:
+        f.write('Timestamp,UniqueID\n')
+        for entry_id in ids:
+            f.write(f"2025-03-01 00:00:00,{entry_id}\n")
+    return csv_path, os.path.join(directory, 'processed.csv.snapshot.json')
+
+def run_child(csv_path, snapshot_path, sheets_url):
+    """Start a fresh interpreter for one measurement"""
+    # A new process finds the shared sheet cache older than its TTL, so every start fetches
+    for cache_path in (csv_path + '.sheet_cache.json', csv_path + '.sheet_cache.json.meta'):
+        if os.path.exists(cache_path):
+            os.remove(cache_path)
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', csv_path, snapshot_path, sheets_url],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark keyboard_sequence.py time-to-first-keystroke")
+    parser.add_argument("--rows", type=int, default=5000, help="Rows already in the sheet and tracking CSV")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per scenario")
+    parser.add_argument("--child", nargs=3, metavar=("CSV", "SNAPSHOT", "URL"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        sys.exit(0)
+
+    # Serve the fake sheet from this process, as the real API would be served to the child
+    from http.server import ThreadingHTTPServer
+    import threading
+    from loadsim import make_handler
+
+    values = build_sheet(args.rows)
+    server_stats = {'fetches': 0}
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(types.SimpleNamespace(values=lambda: values),
+                                                                server_stats))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    sheets_url = f"http://127.0.0.1:{server.server_address[1]}/v4/spreadsheets"
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path, snapshot_path = prepare(directory, args.rows)
+        results = {'cold (no snapshot)': [], 'warm (snapshot)': []}
+        for _ in range(args.runs):
+            if os.path.exists(snapshot_path):
+                os.remove(snapshot_path)
+            results['cold (no snapshot)'].append(run_child(csv_path, snapshot_path, sheets_url))
+            results['warm (snapshot)'].append(run_child(csv_path, snapshot_path, sheets_url))
+    server.shutdown()
+
+    print(f"Time to first keystroke with {args.rows} processed rows ({args.runs} runs, median):")
+    for scenario, runs in results.items():
+        import_ms = statistics.median(r['import_ms'] for r in runs)
+        first_ms = statistics.median(r['first_keystroke_ms'] for r in runs)
+        print(f"  {scenario:20s} import {import_ms:7.1f} ms   first keystroke {first_ms:7.1f} ms")
+    print(f"  requests imported before first keystroke: {runs[-1]['requests_imported']}")
+    print(f"  sqlite3 imported before first keystroke: {runs[-1]['sqlite3_imported']}")
+    print(f"  sheet fetched over HTTP {server_stats['fetches']} times (once per start)")
+    print(f"  plus configured INITIAL_DELAY of {runs[-1]['initial_delay']} s")
@@ -5,6 +5,8 @@ import re
 from email import policy
 from email.parser import BytesParser
 
+import rollups
+
 # Directory containing .eml files
 ATTACHMENTS_DIR = "../Attachments/"
 OUTPUT_CSV = "extracted_data.csv"
@@ -100,5 +102,9 @@ def save_to_csv(data):
 
     print(f"Extracted data saved to {OUTPUT_CSV}")
 
+    # Tickets already counted on a previous run are skipped
+    added = rollups.record_tickets(data)
+    print(f"Added {added} new tickets to throughput rollups")
+
 # Run the script
 process_eml_files()
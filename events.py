@@ -0,0 +1,125 @@
+import json
+import logging
+import queue
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+class Subscriber:
+    """A single live-feed client with its own bounded event buffer"""
+
+    def __init__(self, buffer_size):
+        self.queue = queue.Queue(maxsize=buffer_size)
+        self.closed = False
+
+    def get(self, timeout):
+        """Wait for the next event, or return None on timeout"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+class EventBroadcaster:
+    """Fan events out to many subscribers without letting a slow one hold up the rest"""
+
+    def __init__(self, buffer_size=100, history_size=100):
+        self.buffer_size = buffer_size
+        self.subscribers = set()
+        self.history = deque(maxlen=history_size)  # Replayed to clients that reconnect
+        self.next_id = 1
+        self.dropped = 0
+        self.lock = threading.Lock()
+
+    def subscribe(self, last_event_id=None):
+        """Register a new client, replaying the newest events it missed"""
+        subscriber = Subscriber(self.buffer_size)
+        with self.lock:
+            if last_event_id is not None:
+                # Replay at most half a buffer, so the client has room for live events and is not
+                # dropped again by the next publish; older missed events are reported as a gap
+                missed = [event for event in self.history if event[0] > last_event_id]
+                replay = missed[len(missed) - self.buffer_size // 2:] if self.buffer_size // 2 else []
+                first_id = replay[0][0] if replay else self.next_id
+                if first_id > last_event_id + 1 or last_event_id >= self.next_id:
+                    # Events were skipped or aged out of history (or the server restarted)
+                    subscriber.queue.put_nowait((None, 'reset', json.dumps(
+                        {'last_event_id': last_event_id, 'missed': max(0, first_id - last_event_id - 1)})))
+                for event in replay:
+                    if subscriber.queue.full():
+                        break
+                    subscriber.queue.put_nowait(event)
+            self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        """Remove a client"""
+        with self.lock:
+            self.subscribers.discard(subscriber)
+        subscriber.closed = True
+
+    def publish(self, event_type, data):
+        """Send an event to every client; clients whose buffer is full are dropped"""
+        with self.lock:
+            event = (self.next_id, event_type, json.dumps(data))
+            self.next_id += 1
+            self.history.append(event)
+            for subscriber in list(self.subscribers):
+                try:
+                    subscriber.queue.put_nowait(event)
+                except queue.Full:
+                    # Slow consumer: disconnect it, it can reconnect and replay from history
+                    self.subscribers.discard(subscriber)
+                    subscriber.closed = True
+                    self.dropped += 1
+                    logger.warning(f"Dropped slow event stream client (buffer of {self.buffer_size} full)")
+
+    def stream(self, subscriber, keepalive=15):
+        """Yield server-sent-event text for a client until it disconnects or is dropped"""
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                # A dropped client still gets the events already buffered for it
+                event = subscriber.get(0 if subscriber.closed else keepalive)
+                if event is None:
+                    if subscriber.closed:
+                        break
+                    yield ': keepalive\n\n'
+                    continue
+                event_id, event_type, payload = event
+                if event_id is None:
+                    yield f"event: {event_type}\ndata: {payload}\n\n"  # Keeps the client's Last-Event-ID
+                else:
+                    yield f"id: {event_id}\nevent: {event_type}\ndata: {payload}\n\n"
+        finally:
+            self.unsubscribe(subscriber)
+
+class RemotePublisher:
+    """Post events to a keyboard server's feed from another process, off the typing path"""
+
+    def __init__(self, url, queue_size=100, timeout=1.0):
+        self.url = url
+        self.timeout = timeout
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def publish(self, event_type, data):
+        """Queue an event for sending; events are dropped if the server is not keeping up"""
+        try:
+            self.queue.put_nowait({'event': event_type, 'data': dict(data, time=time.time())})
+        except queue.Full:
+            logger.debug(f"Event queue full, dropping {event_type} event")
+
+    def _run(self):
+        """Send queued events one at a time"""
+        import urllib.request  # Kept off the startup path of the publishing process
+
+        while True:
+            body = json.dumps(self.queue.get()).encode()
+            request = urllib.request.Request(self.url, data=body, headers={'Content-Type': 'application/json'})
+            try:
+                urllib.request.urlopen(request, timeout=self.timeout).close()
+            except Exception as e:
+                logger.debug(f"Could not publish event to {self.url}: {e}")
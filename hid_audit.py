@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+import argparse
+import logging
+import mmap
+import os
+import struct
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Binary ring log of every HID report written, for proving what was typed and when.
+#
+# File layout: a 64-byte header followed by `capacity` fixed 24-byte records. Once full,
+# the oldest records are overwritten. Each record is
+#   timestamp (float64) | entry number (uint32) | kind (uint8) | 3 pad | 8 report bytes
+# An entry starts with a BEGIN record followed by ID records carrying its entry ID 8 bytes
+# at a time, and finishes with an END record (report[0] is 1 if it completed, 0 if it failed).
+
+MAGIC = b'HIDAUD1\0'
+HEADER = struct.Struct('<8sIIQI')  # magic, record size, capacity, records written, last entry number
+HEADER_SIZE = 64
+RECORD = struct.Struct('<dIB3x8s')
+COUNT = struct.Struct('<Q')
+COUNT_OFFSET = 16  # Offset of 'records written' in the header
+
+KIND_REPORT, KIND_BEGIN, KIND_ID, KIND_END = 0, 1, 2, 3
+
+class HIDAuditLog:
+    """Memory-mapped ring of HID report records"""
+
+    def __init__(self, path, capacity=262144):
+        size = HEADER_SIZE + capacity * RECORD.size
+        if os.path.exists(path) and os.path.getsize(path):
+            with open(path, 'rb') as f:
+                header = f.read(HEADER.size)
+            magic, record_size, old_capacity, _, _ = (
+                HEADER.unpack(header) if len(header) == HEADER.size else (b'', 0, 0, 0, 0))
+            if magic != MAGIC:
+                raise ValueError(f"{path} exists and is not a HID audit log")
+            if record_size != RECORD.size or old_capacity != capacity:
+                # Never truncate an existing trail: keep it under a new name and start a new one
+                rotated = f"{path}.{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+                os.replace(path, rotated)
+                logger.warning(f"HID audit log size changed ({old_capacity} -> {capacity} records), "
+                               f"previous log kept as {rotated}")
+
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            file_size = os.fstat(fd).st_size
+            if file_size == 0:
+                os.ftruncate(fd, size)
+            elif file_size != size:
+                raise ValueError(f"{path} is {file_size} bytes, expected {size}; not opening it")
+            header = os.pread(fd, HEADER.size, 0)
+            self.mm = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+        self.capacity = capacity
+        magic, _, _, self.count, self.last_entry = HEADER.unpack(header)
+        if magic != MAGIC:
+            self.count = self.last_entry = 0  # New file
+        HEADER.pack_into(self.mm, 0, MAGIC, RECORD.size, capacity, self.count, self.last_entry)
+        self.entry = 0  # Entry number stamped on reports (0 outside of an entry)
+
+    def _append(self, kind, payload, timestamp=None):
+        RECORD.pack_into(self.mm, HEADER_SIZE + (self.count % self.capacity) * RECORD.size,
+                         timestamp or time.time(), self.entry, kind, payload)
+        self.count += 1
+        COUNT.pack_into(self.mm, COUNT_OFFSET, self.count)
+
+    def record(self, report):
+        """Record one HID report (bytes)"""
+        self._append(KIND_REPORT, report)
+
+    def begin(self, entry_id):
+        """Start a new entry; reports recorded until end() are attributed to it"""
+        self.last_entry += 1
+        self.entry = self.last_entry
+        HEADER.pack_into(self.mm, 0, MAGIC, RECORD.size, self.capacity, self.count, self.last_entry)
+        now = time.time()
+        self._append(KIND_BEGIN, b'', now)
+        encoded = str(entry_id).encode('utf-8')
+        for start in range(0, len(encoded), 8):
+            self._append(KIND_ID, encoded[start:start + 8], now)
+
+    def end(self, success=True):
+        """Finish the current entry and push the log to disk"""
+        self._append(KIND_END, b'\1' if success else b'\0')
+        self.entry = 0
+        self.mm.flush()
+
+    def close(self):
+        self.mm.flush()
+        self.mm.close()
+
+def open_audit_log(path, capacity):
+    """Open the audit log, or return None (with a warning) if disabled or unavailable"""
+    if not path or not capacity:
+        return None
+    try:
+        return HIDAuditLog(path, capacity)
+    except (OSError, ValueError) as e:
+        logger.warning(f"HID audit log disabled, could not open {path}: {e}")
+        return None
+
+def read_records(path):
+    """Yield (timestamp, entry number, kind, report) records in write order"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, record_size, capacity, count, _ = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or record_size != RECORD.size:
+        raise ValueError(f"{path} is not a HID audit log")
+    for n in range(max(0, count - capacity), count):
+        yield RECORD.unpack_from(data, HEADER_SIZE + (n % capacity) * RECORD.size)
+
+# Key code -> text, the reverse of keyboard_sequence's KEY_CODES / SHIFTED_CHARS tables
+KEY_NAMES = {40: '<enter>', 41: '<esc>', 42: '<backspace>', 43: '<tab>'}
+UNSHIFTED = dict(zip(range(4, 30), 'abcdefghijklmnopqrstuvwxyz'))
+UNSHIFTED.update(zip(range(30, 40), '1234567890'))
+UNSHIFTED.update({44: ' ', 45: '-', 46: '=', 47: '[', 48: ']', 49: '\\', 51: ';', 52: "'",
+                  53: '`', 54: ',', 55: '.', 56: '/'})
+SHIFTED = dict(zip(range(4, 30), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'))
+SHIFTED.update(zip(range(30, 40), '!@#$%^&*()'))
+SHIFTED.update({45: '_', 46: '+', 47: '{', 48: '}', 49: '|', 51: ':', 52: '"', 53: '~',
+                54: '<', 55: '>', 56: '?'})
+SHIFT_MODIFIERS = 0x02 | 0x20  # Left and right shift
+
+def report_text(report):
+    """Text produced by one HID report ('' for key releases)"""
+    modifiers, key_code = report[0], report[2]
+    if not key_code:
+        return ''
+    if key_code in KEY_NAMES:
+        return KEY_NAMES[key_code]
+    table = SHIFTED if modifiers & SHIFT_MODIFIERS else UNSHIFTED
+    return table.get(key_code, f"<{key_code}>")
+
+def decode(path):
+    """Rebuild the typed text per entry; returns a list of entry dicts in log order"""
+    entries = {}
+    order = []
+    for timestamp, entry_no, kind, payload in read_records(path):
+        entry = entries.get(entry_no)
+        if entry is None:
+            # Reports outside an entry (entry 0), or an entry whose BEGIN was overwritten
+            entry = entries[entry_no] = {'entry': entry_no, 'id': b'', 'start': timestamp, 'end': None,
+                                         'status': 'partial' if entry_no else 'untracked',
+                                         'reports': 0, 'text': []}
+            order.append(entry_no)
+        if kind == KIND_BEGIN:
+            entry['start'] = timestamp
+            entry['status'] = 'interrupted'
+        elif kind == KIND_ID:
+            entry['id'] += payload.rstrip(b'\0')
+        elif kind == KIND_END:
+            entry['end'] = timestamp
+            outcome = 'completed' if payload[0] else 'failed'
+            # An entry whose start was overwritten stays partial; its outcome is noted alongside
+            entry['status'] = f"partial, {outcome}" if entry['status'].startswith('partial') else outcome
+        else:
+            entry['reports'] += 1
+            entry['end'] = timestamp
+            entry['text'].append(report_text(payload))
+    for entry in entries.values():
+        entry['id'] = entry['id'].decode('utf-8', 'replace')
+        entry['text'] = ''.join(entry['text'])
+    return [entries[entry_no] for entry_no in order]
+
+def format_time(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3] if timestamp else '-'
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Decode a HID audit log into the text typed per entry")
+    parser.add_argument("path", nargs="?", default="hid_audit.bin", help="Audit log file")
+    parser.add_argument("--entry", help="Only show entries whose ID contains this text")
+    args = parser.parse_args()
+
+    for entry in decode(args.path):
+        if args.entry and args.entry not in entry['id']:
+            continue
+        print(f"#{entry['entry']} [{entry['status']}] {entry['id'] or '(no entry id)'}")
+        print(f"  {format_time(entry['start'])} -> {format_time(entry['end'])}, {entry['reports']} reports")
+        print(f"  {entry['text']!r}")
@@ -1,6 +1,12 @@
 import requests
 import argparse
+import csv
 import json
+import os
+import queue
+import sys
+import threading
+import time
 
 def check_status(host):
     """Check the status of the keyboard server"""
@@ -41,6 +47,136 @@ def press_key(host, key):
         print(f"Error: {e}")
         return False
 
+def read_entries(source, fmt):
+    """Yield entries (dicts) from a CSV or NDJSON file, or from stdin when source is '-'"""
+    f = sys.stdin if source == '-' else open(source, 'r', newline='', encoding='utf-8')
+    try:
+        if fmt == 'ndjson':
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(f)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def parse_keys(text):
+    """Parse end-of-entry keys like 'enter:2,tab' into [{'key': 'enter', 'times': 2}, ...]"""
+    keys = []
+    for item in filter(None, (part.strip() for part in text.split(','))):
+        key, _, times = item.partition(':')
+        keys.append({'key': key, 'times': int(times) if times else 1})
+    return keys
+
+def build_steps(entry, fields, between_key, end_keys, delay, field_delay, entry_delay):
+    """Turn one entry into the server's text/key/sleep steps, in field order"""
+    steps = []
+    for field in fields or entry.keys():
+        if field not in entry:
+            continue
+        value = entry[field]
+        if value not in (None, ''):
+            steps.append({'text': str(value), 'delay': delay})
+        steps.append({'key': between_key})
+        if field_delay:
+            steps.append({'sleep': field_delay})
+    steps.extend(end_keys)
+    if entry_delay:
+        steps.append({'sleep': entry_delay})
+    return steps
+
+def load_checkpoint(path):
+    """Number of entries already typed according to a checkpoint file"""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f).get('done', 0)
+    except (OSError, ValueError):
+        return 0
+
+def save_checkpoint(path, source, done):
+    """Record how many entries have been typed, atomically"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'source': source, 'done': done, 'updated': time.time()}, f)
+    os.replace(tmp_path, path)
+
+def feed(host, args):
+    """Type a stream of entries through the server in batches over one session"""
+    fmt = args.format or ('ndjson' if args.source == '-' or args.source.endswith(('.ndjson', '.jsonl')) else 'csv')
+    fields = [field.strip() for field in args.fields.split(',')] if args.fields else None
+    end_keys = parse_keys(args.end_keys)
+    checkpoint = args.checkpoint or ('feed.checkpoint.json' if args.source == '-' else args.source + '.checkpoint.json')
+    skip = load_checkpoint(checkpoint) if args.resume else 0
+    if skip:
+        print(f"Resuming after {skip} entries already typed (from {checkpoint})")
+
+    # Read and build batches ahead on a separate thread while the server types
+    batches = queue.Queue(maxsize=args.prefetch)
+
+    def produce():
+        try:
+            batch = []
+            for number, entry in enumerate(read_entries(args.source, fmt)):
+                if number < skip:
+                    continue
+                steps = build_steps(entry, fields, args.between_key, end_keys,
+                                    args.delay, args.field_delay, args.entry_delay)
+                chars = sum(len(step.get('text', '')) for step in steps)
+                batch.append(({'id': number + 1, 'steps': steps}, chars))
+                if len(batch) >= args.batch:
+                    batches.put(batch)
+                    batch = []
+            if batch:
+                batches.put(batch)
+            batches.put(None)
+        except Exception as e:
+            batches.put(e)
+    threading.Thread(target=produce, daemon=True).start()
+
+    session = requests.Session()  # One kept-alive connection for the whole feed
+    done = skip
+    typed = chars_typed = requests_sent = 0
+    start = time.time()
+    success = True
+    while True:
+        batch = batches.get()
+        if batch is None:
+            break
+        if isinstance(batch, Exception):
+            print(f"Error reading {args.source}: {batch}")
+            success = False
+            break
+
+        try:
+            response = session.post(f"http://{host}:5000/sequence",
+                                     json={'entries': [entry for entry, _ in batch]})
+            result = response.json()
+        except Exception as e:
+            print(f"Error: {e}")
+            success = False
+            break
+        requests_sent += 1
+
+        batch_typed = result.get('typed', 0)
+        done += batch_typed
+        typed += batch_typed
+        chars_typed += sum(chars for _, chars in batch[:batch_typed])
+        save_checkpoint(checkpoint, args.source, done)
+        print(f"Typed entries up to #{done}")
+        if not result.get('success'):
+            print(f"Error: entry #{done + 1} failed: {result.get('error', 'HID write failed')}")
+            success = False
+            break
+
+    elapsed = time.time() - start
+    print(f"\n{typed} entries ({chars_typed} characters) in {elapsed:.1f}s over {requests_sent} requests")
+    if elapsed > 0:
+        print(f"Throughput: {typed / elapsed * 60:.1f} entries/min, {chars_typed / elapsed:.1f} chars/s")
+    if not success:
+        print(f"Stopped after entry #{done}; check the form, then rerun with --resume to continue")
+    return success
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Test client for Raspberry Pi Keyboard Server")
     parser.add_argument("--host", required=True, help="IP address of the Raspberry Pi")
@@ -59,6 +195,21 @@ if __name__ == "__main__":
     key_parser = subparsers.add_parser("key", help="Press a key")
     key_parser.add_argument("key", help="Key to press (e.g., 'enter', 'tab', 'a')")
     
+    # Feed command
+    feed_parser = subparsers.add_parser("feed", help="Type entries from a CSV or NDJSON file (or stdin)")
+    feed_parser.add_argument("source", help="CSV/NDJSON file, or '-' for stdin")
+    feed_parser.add_argument("--format", choices=["csv", "ndjson"], help="Input format (default: from extension, NDJSON for stdin)")
+    feed_parser.add_argument("--fields", help="Comma-separated fields to type, in order (default: all columns)")
+    feed_parser.add_argument("--between-key", default="tab", help="Key pressed after each field")
+    feed_parser.add_argument("--end-keys", default="enter:2", help="Keys pressed after each entry, e.g. 'enter:2,tab'")
+    feed_parser.add_argument("--delay", type=float, default=0.05, help="Delay between keypresses")
+    feed_parser.add_argument("--field-delay", type=float, default=0.5, help="Delay after each field")
+    feed_parser.add_argument("--entry-delay", type=float, default=2, help="Delay after each entry")
+    feed_parser.add_argument("--batch", type=int, default=10, help="Entries sent per request")
+    feed_parser.add_argument("--prefetch", type=int, default=4, help="Batches prepared ahead of the server")
+    feed_parser.add_argument("--checkpoint", help="Checkpoint file (default: <source>.checkpoint.json)")
+    feed_parser.add_argument("--resume", action="store_true", help="Skip entries already typed according to the checkpoint")
+    
     args = parser.parse_args()
     
     if args.command == "status":
@@ -67,5 +218,7 @@ if __name__ == "__main__":
         type_text(args.host, args.text, args.delay)
     elif args.command == "key":
         press_key(args.host, args.key)
+    elif args.command == "feed":
+        sys.exit(0 if feed(args.host, args) else 1)
     else:
         parser.print_help()
\ No newline at end of file
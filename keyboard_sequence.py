@@ -1,19 +1,68 @@
 #!/usr/bin/env python3
 import time
-import requests
 import json
 import csv
 import os
 import logging
 from datetime import datetime
 
+from events import RemotePublisher
+from tracing import LatencyTracer, format_summary
+from sheet_rows import rows_from_values, split_timestamp, split_vehicle_type
+from validation import DEFAULT_RULES, Validator, Quarantine
+from sheet_cache import SHEET_CACHE_PATH, SheetCache, fetch_values
+from row_diff import RowTracker, append_review
+
 # Import configuration settings
+import config
 from config import (
     SPREADSHEET_ID, SHEET_NAME, API_KEY, LOCAL_CSV_PATH, LOG_FILE,
     TYPE_DELAY, FIELD_DELAY, ENTRY_DELAY, INITIAL_DELAY, CHECK_INTERVAL,
     FIELDS_TO_TYPE, FIELD_MAPPINGS, ID_FIELDS, BETWEEN_FIELDS_KEY, END_ENTRY_KEYS
 )
 
+# Sheets API base URL (overridable so a local fake can stand in, see loadsim.py)
+SHEETS_API_URL = getattr(config, 'SHEETS_API_URL', 'https://sheets.googleapis.com/v4/spreadsheets')
+
+# Keyboard server endpoint for live entry events (set to None to disable)
+EVENTS_URL = getattr(config, 'EVENTS_URL', 'http://127.0.0.1:5000/events/publish')
+
+# Catch-up mode: with at least this many new entries, type them back to back without the
+# focus-switch delay, in one of these orders:
+#   'oldest'  oldest form Timestamp first
+#   'truck'   longest-waiting truck first: entries grouped by VEHICLE_NUMBER_FIELD, trucks
+#             ordered by their oldest entry, so a truck's 1st and 2nd entries are typed together
+CATCHUP_THRESHOLD = getattr(config, 'CATCHUP_THRESHOLD', 3)
+CATCHUP_ORDER = getattr(config, 'CATCHUP_ORDER', 'oldest')
+CATCHUP_ORDERS = {'oldest': 'oldest submission first', 'truck': 'longest-waiting truck first'}
+if CATCHUP_ORDER not in CATCHUP_ORDERS:
+    raise ValueError(f"CATCHUP_ORDER must be one of {', '.join(CATCHUP_ORDERS)}, not {CATCHUP_ORDER!r}")
+VEHICLE_NUMBER_FIELD = getattr(config, 'VEHICLE_NUMBER_FIELD', 'Vehicle Number')
+
+# Where rolling per-stage latency percentiles are written after each cycle
+LATENCY_STATS_PATH = getattr(config, 'LATENCY_STATS_PATH', 'latency_stats.json')
+
+# Snapshot of processed entry IDs used to warm-start without re-reading the whole tracking CSV
+PROCESSED_SNAPSHOT_PATH = getattr(config, 'PROCESSED_SNAPSHOT_PATH', LOCAL_CSV_PATH + '.snapshot.json')
+
+# Rules new entries must pass before they are typed (see validation.py); failing entries are
+# written once to the quarantine CSV with the reasons and skipped until fixed in the sheet
+VALIDATION_RULES = getattr(config, 'VALIDATION_RULES', DEFAULT_RULES)
+QUARANTINE_CSV_PATH = getattr(config, 'QUARANTINE_CSV_PATH', 'quarantined_entries.csv')
+
+# Per-row content hashes from the last fetch, used to tell edited and deleted rows from new
+# ones; edits of already typed rows are held back and, like deletions, reported for review
+ROW_HASHES_PATH = getattr(config, 'ROW_HASHES_PATH', LOCAL_CSV_PATH + '.rows.json')
+REVIEW_CSV_PATH = getattr(config, 'REVIEW_CSV_PATH', 'review_changes.csv')
+
+# Keyboard gadget device the HID reports are written to
+HID_DEVICE_PATH = getattr(config, 'HID_DEVICE_PATH', '/dev/hidg0')
+
+# Binary ring log of every HID report sent (decode with hid_audit.py); 24 bytes per record,
+# so the default keeps the last 262144 reports in 6 MiB. Set the path to None to disable.
+AUDIT_LOG_PATH = getattr(config, 'AUDIT_LOG_PATH', 'hid_audit.bin')
+AUDIT_LOG_RECORDS = getattr(config, 'AUDIT_LOG_RECORDS', 262144)
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO, 
@@ -28,11 +77,45 @@ logger = logging.getLogger(__name__)
 # Keyboard HID constants
 NULL_CHAR = chr(0)
 
+event_publisher = RemotePublisher(EVENTS_URL) if EVENTS_URL else None
+
+# Per-entry stage timestamps, keyed by entry ID, from submission to commit
+tracer = LatencyTracer()
+last_fetched_at = None  # When the rows returned by the last get_sheet_data() left the API
+
+hid_audit = None  # Opened by main(), so importing this module never touches the real log
+
+# Sheet snapshot shared with the other local readers (sheets_api.py, dashboards)
+sheet_cache = SheetCache(SHEET_CACHE_PATH, f"{SPREADSHEET_ID}/{SHEET_NAME}")
+
+row_tracker = RowTracker(ROW_HASHES_PATH)
+
+validator = Validator(VALIDATION_RULES)
+quarantine = Quarantine(QUARANTINE_CSV_PATH)
+
+def publish_event(event_type, **data):
+    """Send an entry lifecycle event to the live feed, if enabled"""
+    if event_publisher is not None:
+        event_publisher.publish(event_type, data)
+
+def audit_begin(entry_id):
+    """Attribute the HID reports that follow to an entry in the audit log"""
+    if hid_audit is not None:
+        hid_audit.begin(entry_id)
+
+def audit_end(success):
+    """Close the current entry in the audit log"""
+    if hid_audit is not None and hid_audit.entry:
+        hid_audit.end(success)
+
 def write_report(report):
     """Write a report to the HID device"""
     try:
-        with open('/dev/hidg0', 'rb+') as fd:
-            fd.write(report.encode())
+        data = report.encode()
+        with open(HID_DEVICE_PATH, 'rb+') as fd:
+            fd.write(data)
+        if hid_audit is not None:
+            hid_audit.record(data)
         # Print statement for keyboard activity
         print(f"Keyboard action: Sent keyboard report")
     except Exception as e:
@@ -55,19 +138,28 @@ def press_shift_key(key_code):
     write_report(chr(32) + NULL_CHAR + chr(key_code) + NULL_CHAR*5)
     release_keys()
 
+# HID key codes, built once at import time rather than on every keypress
+KEY_CODES = {
+    'a': 4, 'b': 5, 'c': 6, 'd': 7, 'e': 8, 'f': 9, 'g': 10, 'h': 11, 'i': 12,
+    'j': 13, 'k': 14, 'l': 15, 'm': 16, 'n': 17, 'o': 18, 'p': 19, 'q': 20,
+    'r': 21, 's': 22, 't': 23, 'u': 24, 'v': 25, 'w': 26, 'x': 27, 'y': 28,
+    'z': 29, '1': 30, '2': 31, '3': 32, '4': 33, '5': 34, '6': 35, '7': 36,
+    '8': 37, '9': 38, '0': 39, ' ': 44, '-': 45, '=': 46, '[': 47, ']': 48,
+    '\\': 49, ';': 51, "'": 52, '`': 53, ',': 54, '.': 55, '/': 56, '\t': 43,
+    '|': 49, ':': 51, '"': 52, '<': 54, '>': 55, '?': 56, '_': 45, '+': 46,
+    '{': 47, '}': 48
+}
+
+# Special characters that need shift, mapped to their unshifted key
+SHIFTED_CHARS = {
+    '!': '1', '@': '2', '#': '3', '$': '4', '%': '5', '^': '6', '&': '7',
+    '*': '8', '(': '9', ')': '0', '_': '-', '+': '=', '{': '[', '}': ']',
+    '|': '\\', ':': ';', '"': "'", '<': ',', '>': '.', '?': '/'
+}
+
 def get_key_code(char):
     """Get HID key code for a character"""
-    key_codes = {
-        'a': 4, 'b': 5, 'c': 6, 'd': 7, 'e': 8, 'f': 9, 'g': 10, 'h': 11, 'i': 12,
-        'j': 13, 'k': 14, 'l': 15, 'm': 16, 'n': 17, 'o': 18, 'p': 19, 'q': 20,
-        'r': 21, 's': 22, 't': 23, 'u': 24, 'v': 25, 'w': 26, 'x': 27, 'y': 28,
-        'z': 29, '1': 30, '2': 31, '3': 32, '4': 33, '5': 34, '6': 35, '7': 36,
-        '8': 37, '9': 38, '0': 39, ' ': 44, '-': 45, '=': 46, '[': 47, ']': 48,
-        '\\': 49, ';': 51, "'": 52, '`': 53, ',': 54, '.': 55, '/': 56, '\t': 43,
-        '|': 49, ':': 51, '"': 52, '<': 54, '>': 55, '?': 56, '_': 45, '+': 46,
-        '{': 47, '}': 48
-    }
-    return key_codes.get(char.lower(), 0)
+    return KEY_CODES.get(char.lower(), 0)
 
 def type_string(string, delay=None):
     """Type a string by simulating keypresses"""
@@ -78,17 +170,10 @@ def type_string(string, delay=None):
     print(f"TYPING: '{string}'")
     
     for char in string:
-        if char.isupper() or char in '!@#$%^&*()_+{}|:"<>?':
-            # Special characters that need shift
-            shifted_chars = {
-                '!': '1', '@': '2', '#': '3', '$': '4', '%': '5', '^': '6', '&': '7', 
-                '*': '8', '(': '9', ')': '0', '_': '-', '+': '=', '{': '[', '}': ']', 
-                '|': '\\', ':': ';', '"': "'", '<': ',', '>': '.', '?': '/'
-            }
-            
-            if char in shifted_chars:
-                print(f"  - Pressing SHIFT+{shifted_chars[char]}")
-                press_shift_key(get_key_code(shifted_chars[char]))
+        if char.isupper() or char in SHIFTED_CHARS:
+            if char in SHIFTED_CHARS:
+                print(f"  - Pressing SHIFT+{SHIFTED_CHARS[char]}")
+                press_shift_key(get_key_code(SHIFTED_CHARS[char]))
             else:
                 print(f"  - Pressing SHIFT+{char.lower()}")
                 press_shift_key(get_key_code(char.lower()))
@@ -134,7 +219,7 @@ def press_key_by_name(key_name, times=1):
 
 def get_sheet_data():
     """Fetch data from Google Sheets API"""
-    url = f'https://sheets.googleapis.com/v4/spreadsheets/{SPREADSHEET_ID}/values/{SHEET_NAME}!A1:Z?alt=json&key={API_KEY}'
+    url = f'{SHEETS_API_URL}/{SPREADSHEET_ID}/values/{SHEET_NAME}!A1:Z?alt=json&key={API_KEY}'
     
     print("\n" + "="*60)
     print(f"FETCHING DATA: Requesting data from Google Sheets API")
@@ -142,28 +227,26 @@ def get_sheet_data():
     
     try:
         logger.info(f"Fetching data from Google Sheets")
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
+        # Served from the shared snapshot unless it is older than SHEET_CACHE_TTL
+        snapshot = sheet_cache.get(lambda: fetch_values(url))
+        values = snapshot['values']
         
-        if 'values' not in data:
+        if not values:
             warning_msg = "No data found in the sheet."
             logger.warning(warning_msg)
             print(f"WARNING: {warning_msg}")
             return []
             
-        headers = data['values'][0]
-        rows = data['values'][1:]
+        headers = values[0]
         
-        print(f"SUCCESS: Retrieved data with {len(rows)} rows")
+        print(f"SUCCESS: Retrieved data with {len(values) - 1} rows "
+              f"(version {snapshot['version']}, {time.time() - snapshot['fetched_at']:.1f}s old)")
         print(f"Headers: {headers}")
         
-        # Convert to list of dictionaries
-        entries = []
-        for row in rows:
-            # Pad row with empty strings if shorter than headers
-            padded_row = row + [''] * (len(headers) - len(row))
-            entries.append(dict(zip(headers, padded_row)))
+        # Wrap the API's row lists in compact rows sharing one header index (no padding or copies)
+        global last_fetched_at
+        last_fetched_at = snapshot['fetched_at']
+        entries = rows_from_values(values)
         
         logger.info(f"Fetched {len(entries)} entries from Google Sheets")
         
@@ -175,64 +258,98 @@ def get_sheet_data():
         
         return entries
         
-    except requests.exceptions.RequestException as e:
+    except (OSError, ValueError) as e:
         error_msg = f"Error fetching data from Google Sheets: {e}"
         logger.error(error_msg)
         print(f"ERROR: {error_msg}")
         return []
 
-def split_vehicle_type(vehicle_type):
-    """Split Vehicle Type into Cost and Vehicle Type"""
-    # Example: "RMC TRUCK 250" -> Cost = "250", Vehicle Type = "RMC TRUCK"
-    parts = vehicle_type.split()
-    if parts and parts[-1].isdigit():  # Check if the last part is a number
-        cost = parts[-1]
-        vehicle = ' '.join(parts[:-1])  # Join all parts except the last one
-        return cost, vehicle
-    return '', vehicle_type  # If no cost is found, return empty cost and original vehicle type
-
 def process_sheet_data(entries):
     """Process the sheet data similar to your save_to_csv function"""
     processed_entries = []
+    normalized_schemas = {}  # id(sheet schema) -> (schema with derived columns, column positions)
     
     print("\nPROCESSING DATA: Preparing entries for typing")
     
     for i, entry in enumerate(entries):
-        # Create a copy of the entry to avoid modifying the original
-        processed_entry = entry.copy()
+        # Normalize in place: rows are re-pointed at a schema with the derived columns
+        schema = entry.schema
+        if id(schema) not in normalized_schemas:
+            derived = []
+            if 'Timestamp' in schema.index:
+                derived += ['Date', 'Time']
+            if 'Vehicle Type' in schema.index:
+                derived += ['Cost']
+            normalized = schema.extend(derived)
+            normalized_schemas[id(schema)] = (normalized, {name: normalized.index.get(name) for name in
+                                              ('Timestamp', 'Date', 'Time', 'Vehicle Type', 'Cost')})
+        normalized, positions = normalized_schemas[id(schema)]
+        processed_entry = entry
+        processed_entry.schema = normalized
+        values = processed_entry.values
+        if len(values) < normalized.width:
+            values.extend([''] * (normalized.width - len(values)))
         
         print(f"\nProcessing entry #{i+1}:")
         
         # Process timestamp if present
-        if 'Timestamp' in processed_entry:
-            timestamp = processed_entry['Timestamp']
+        if positions['Timestamp'] is not None:
+            timestamp = values[positions['Timestamp']]
             try:
-                dt = datetime.strptime(timestamp, '%m/%d/%Y %H:%M:%S')
-                processed_entry['Date'] = dt.strftime('%Y-%m-%d')
-                processed_entry['Time'] = dt.strftime('%H:%M:%S')
-                print(f"  - Split Timestamp: Date={processed_entry['Date']}, Time={processed_entry['Time']}")
+                date, time_of_day = split_timestamp(timestamp)
+                values[positions['Date']] = date
+                values[positions['Time']] = time_of_day
+                print(f"  - Split Timestamp: Date={date}, Time={time_of_day}")
             except ValueError:
-                processed_entry['Date'] = ''
-                processed_entry['Time'] = ''
+                values[positions['Date']] = ''
+                values[positions['Time']] = ''
                 print(f"  - Could not parse Timestamp: {timestamp}")
         
         # Process Vehicle Type if present
-        if 'Vehicle Type' in processed_entry:
-            vehicle_type = processed_entry['Vehicle Type']
+        if positions['Vehicle Type'] is not None:
+            vehicle_type = values[positions['Vehicle Type']]
             cost, vehicle = split_vehicle_type(vehicle_type)
-            processed_entry['Cost'] = cost
-            processed_entry['Vehicle Type'] = vehicle
-            print(f"  - Split Vehicle Type: Vehicle={processed_entry['Vehicle Type']}, Cost={processed_entry['Cost']}")
+            values[positions['Cost']] = cost
+            values[positions['Vehicle Type']] = vehicle
+            print(f"  - Split Vehicle Type: Vehicle={vehicle}, Cost={cost}")
         
         processed_entries.append(processed_entry)
     
     print(f"\nProcessed {len(processed_entries)} entries total")
     return processed_entries
 
+# Processed IDs and how far into the tracking CSV they were read, so each cycle
+# (and a warm start from the snapshot) only parses rows appended since
+processed_cache = {'ids': None, 'size': 0, 'marker': ''}
+
+def read_csv_marker(f, size):
+    """Read the bytes just before an offset, used to check a file was only appended to"""
+    start = max(0, size - 64)
+    f.seek(start)
+    return f.read(size - start).decode('utf-8', errors='replace')
+
+def load_processed_snapshot():
+    """Load the processed-entries snapshot written by the last run"""
+    try:
+        with open(PROCESSED_SNAPSHOT_PATH, 'r') as f:
+            snapshot = json.load(f)
+        return {'ids': set(snapshot['ids']), 'size': snapshot['size'], 'marker': snapshot['marker']}
+    except (OSError, ValueError, KeyError):
+        return None
+
+def save_processed_snapshot():
+    """Write the processed-entries snapshot for the next warm start"""
+    try:
+        tmp_path = PROCESSED_SNAPSHOT_PATH + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'size': processed_cache['size'], 'marker': processed_cache['marker'],
+                       'ids': list(processed_cache['ids'])}, f)
+        os.replace(tmp_path, PROCESSED_SNAPSHOT_PATH)
+    except OSError as e:
+        logger.warning(f"Could not save processed entries snapshot: {e}")
+
 def load_processed_entries():
     """Load previously processed entries from local CSV"""
-    processed = set()
-    
     print(f"\nLOADING PROCESSED ENTRIES: from {LOCAL_CSV_PATH}")
     
     if not os.path.exists(LOCAL_CSV_PATH):
@@ -242,43 +359,58 @@ def load_processed_entries():
             writer = csv.writer(f)
             writer.writerow(['Timestamp', 'UniqueID'])
         print(f"  - Created new empty CSV tracking file")
-        return processed
+        processed_cache.update(ids=set(), size=0, marker='')
+        return set()
     
     try:
-        with open(LOCAL_CSV_PATH, 'r', newline='') as f:
-            reader = csv.reader(f)
-            next(reader)  # Skip header
-            for row in reader:
-                if len(row) >= 2:
-                    processed.add(row[1])  # Add unique ID to set
-        
-        logger.info(f"Loaded {len(processed)} processed entries from local CSV")
-        print(f"  - Successfully loaded {len(processed)} processed entries")
+        if processed_cache['ids'] is None:
+            snapshot = load_processed_snapshot()
+            if snapshot is not None:
+                processed_cache.update(snapshot)
+                print(f"  - Warm start from snapshot with {len(snapshot['ids'])} entries")
+
+        with open(LOCAL_CSV_PATH, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            offset = processed_cache['size']
+            # Fall back to a full read if the file shrank or was rewritten
+            if (processed_cache['ids'] is None or size < offset
+                    or read_csv_marker(f, offset) != processed_cache['marker']):
+                processed_cache.update(ids=set(), size=0, marker='')
+                offset = 0
+            f.seek(offset)
+            data = f.read()
+
+            # Only consume complete lines; a partly written row is picked up next cycle
+            end = data.rfind(b'\n') + 1
+            if end:
+                processed_cache['size'] = offset + end
+                processed_cache['marker'] = read_csv_marker(f, offset + end)
+
+        processed = processed_cache['ids']
+        added = 0
+        reader = csv.reader(data[:end].decode('utf-8').splitlines())
+        if offset == 0:
+            next(reader, None)  # Skip header
+        for row in reader:
+            if len(row) >= 2:
+                processed.add(row[1])  # Add unique ID to set
+                added += 1
+        if end:
+            save_processed_snapshot()
         
-        # Print a few examples if available
-        processed_list = list(processed)
-        if processed_list:
-            examples = processed_list[:3]  # First 3 examples
-            print(f"  - Sample IDs:")
-            for i, example in enumerate(examples):
-                # Truncate very long IDs for readability
-                if len(example) > 50:
-                    print(f"    {i+1}. {example[:50]}...")
-                else:
-                    print(f"    {i+1}. {example}")
-                    
-            if len(processed_list) > 3:
-                print(f"    ... and {len(processed_list) - 3} more")
+        logger.info(f"Loaded {len(processed)} processed entries from local CSV ({added} new rows read)")
+        print(f"  - Successfully loaded {len(processed)} processed entries ({added} new rows read)")
         
         return processed
     except Exception as e:
         error_msg = f"Error loading processed entries: {e}"
         logger.error(error_msg)
         print(f"  - ERROR: {error_msg}")
+        processed_cache.update(ids=None, size=0, marker='')
         return set()
 
-def save_processed_entry(entry_id):
-    """Save a processed entry to the local CSV"""
+def save_processed_entry(entry_id, entry=None):
+    """Save a processed entry to the local CSV and update the throughput rollups"""
     try:
         now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
@@ -292,6 +424,12 @@ def save_processed_entry(entry_id):
             
         logger.info(f"Saved entry {entry_id} to processed entries")
         print(f"  - Successfully saved to {LOCAL_CSV_PATH}")
+
+        if entry is not None:
+            tracer.mark(entry_id, 'committed')
+            tracer.complete(entry_id, entry.get('Timestamp'))
+            import rollups  # sqlite3 is not needed until the first entry is typed
+            rollups.record_entry(entry_id, entry)
     except Exception as e:
         error_msg = f"Error saving processed entry: {e}"
         logger.error(error_msg)
@@ -316,9 +454,11 @@ def apply_field_mapping(field, value):
         return mapped_value
     return value
 
-def type_entry_data(entry):
+def type_entry_data(entry, focus_delay=True, entry_id=None):
     """Type the data from a single entry"""
     logger.info(f"Starting to type data for entry")
+    if entry_id is None:
+        entry_id = generate_entry_id(entry)  # Latency traces are keyed by entry ID
     
     print("\n" + "="*60)
     print("TYPING ENTRY: Beginning keyboard automation sequence")
@@ -327,8 +467,10 @@ def type_entry_data(entry):
         print(f"  {k}: {v}")
     
     # Give some time to switch focus if needed
-    print(f"\nWaiting {INITIAL_DELAY} seconds for application focus...")
-    time.sleep(INITIAL_DELAY)
+    if focus_delay:
+        print(f"\nWaiting {INITIAL_DELAY} seconds for application focus...")
+        time.sleep(INITIAL_DELAY)
+    tracer.mark(entry_id, 'typing_started')
     
     # Type fields in the specified order
     print("\nTyping fields in sequence:")
@@ -367,13 +509,87 @@ def type_entry_data(entry):
             print(f"  - Pressing {key_name.upper()} x{times}")
             press_key_by_name(key_name, times)
     
+    tracer.mark(entry_id, 'typing_finished')
+
     print(f"\nWaiting {ENTRY_DELAY} seconds after entry completion...")
     time.sleep(ENTRY_DELAY)  # Delay after completing an entry
+    tracer.mark(entry_id, 'settled')
     print("ENTRY COMPLETED: Keyboard sequence finished")
     logger.info(f"Completed typing entry data")
 
+def estimate_entry_seconds(entry, focus_delay=True):
+    """Estimate how long type_entry_data() will take for an entry, from the configured delays"""
+    seconds = ENTRY_DELAY + (INITIAL_DELAY if focus_delay else 0)
+    for field in FIELDS_TO_TYPE:
+        if field in entry:
+            value = entry.get(field, '')
+            value = str(FIELD_MAPPINGS.get(field, {}).get(value, value))
+            # TYPE_DELAY per character, then the between-fields key (0.1s) and FIELD_DELAY
+            seconds += len(value) * TYPE_DELAY + 0.1 + FIELD_DELAY
+    for key_config in END_ENTRY_KEYS:
+        seconds += 0.1 * key_config.get('times', 1)
+    return seconds
+
+def order_backlog(new_entries):
+    """Order a backlog of (entry, entry_id) pairs for catch-up typing (see CATCHUP_ORDER)"""
+    dated = [item for item in new_entries if item[0].get('Date')]
+    undated = [item for item in new_entries if not item[0].get('Date')]
+    dated.sort(key=lambda item: (item[0]['Date'], item[0].get('Time', '')))
+    ordered = dated + undated  # Entries without a usable Timestamp go last, in sheet order
+    if CATCHUP_ORDER == 'truck':
+        from reconcile import normalize_vehicle_number
+        # Trucks come out in order of their oldest entry; entries without a vehicle number stand alone
+        trucks = {}
+        for entry, entry_id in ordered:
+            vehicle = normalize_vehicle_number(entry.get(VEHICLE_NUMBER_FIELD, ''))
+            trucks.setdefault(vehicle or entry_id, []).append((entry, entry_id))
+        ordered = [item for items in trucks.values() for item in items]
+    return ordered
+
+def review_changes(changes, entries, entry_ids, processed_entries):
+    """Hold back edits of already typed rows and report edits and deletions for manual review"""
+    records = []
+    for change, key, position, previous_id, typed in row_tracker.review(changes, entry_ids, processed_entries):
+        if change == 'edited':
+            entry = entries[position]
+            records.append((change, key, position, previous_id, typed, entry))
+            print(f"EDITED row {position + 2} ({entry.get('Timestamp')})" + (", held for review" if typed else ""))
+            logger.warning(f"Row {position + 2} edited in the sheet: {previous_id} -> {entry_ids[position]}")
+            publish_event('edited', entry_id=entry_ids[position], previous_entry_id=previous_id, typed=typed)
+        else:
+            records.append((change, key, position, previous_id, typed, None))
+            print(f"DELETED row {position + 2} ({key.rpartition('#')[0]})")
+            logger.warning(f"Row {position + 2} deleted from the sheet: {previous_id}")
+            publish_event('deleted', entry_id=previous_id, typed=typed)
+    append_review(REVIEW_CSV_PATH, records)
+
+def screen_entries(new_entries):
+    """Drop (and quarantine) new entries that fail validation, before any typing time is spent"""
+    valid = []
+    for entry, entry_id in new_entries:
+        reasons = validator.validate(entry)
+        if not reasons:
+            valid.append((entry, entry_id))
+            continue
+        if quarantine.add(entry_id, entry, reasons):
+            print(f"QUARANTINED entry {entry_id[:30]}...: {'; '.join(reasons)}")
+            logger.warning(f"Quarantined entry {entry_id}: {'; '.join(reasons)}")
+            publish_event('quarantined', entry_id=entry_id, reasons=reasons)
+    return valid
+
+def format_duration(seconds):
+    """Format seconds as e.g. '1h 02m 03s'"""
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {(seconds % 3600) // 60:02d}m {seconds % 60:02d}s"
+    return f"{seconds // 60}m {seconds % 60:02d}s"
+
 def main():
     """Main function to check for new data and type it"""
+    global hid_audit
+    if hid_audit is None:
+        from hid_audit import open_audit_log
+        hid_audit = open_audit_log(AUDIT_LOG_PATH, AUDIT_LOG_RECORDS)
     logger.info("Starting Vehicle Entry Keyboard Automation")
     
     print("\n" + "="*80)
@@ -407,43 +623,92 @@ def main():
                 print("No entries found in the Google Sheet")
                 logger.warning("No entries found in the Google Sheet")
             else:
+                # Diff row contents against the last fetch before they are normalized
+                changes = row_tracker.diff(raw_entries)
+                
                 # Process the sheet data to prepare for typing
                 entries = process_sheet_data(raw_entries)
+                normalized_at = time.time()
+                
+                # Generate a unique ID for each entry
+                entry_ids = [generate_entry_id(entry) for entry in entries]
+                review_changes(changes, entries, entry_ids, processed_entries)
+                row_tracker.commit(changes, entry_ids)
                 
                 # Find new entries
                 new_entries = []
-                for entry in entries:
-                    # Generate a unique ID for this entry
-                    entry_id = generate_entry_id(entry)
-                    
+                for entry, entry_id in zip(entries, entry_ids):
                     # Check if this entry has already been processed
-                    if entry_id not in processed_entries:
+                    if entry_id in row_tracker.held:
+                        print(f"Holding EDITED entry for review: {entry_id[:30]}...")
+                    elif entry_id not in processed_entries:
                         print(f"Found NEW entry with ID: {entry_id[:30]}...")
                         new_entries.append((entry, entry_id))
                     else:
                         print(f"Skipping EXISTING entry with ID: {entry_id[:30]}...")
                 
+                # Hold back malformed entries rather than typing them and undoing by hand
+                new_entries = screen_entries(new_entries)
+                
+                # Trace and announce only the entries about to be typed; the whole sheet is fetched
+                # every cycle, and quarantined entries are announced once as 'quarantined'
+                for entry, entry_id in new_entries:
+                    tracer.mark(entry_id, 'seen', last_fetched_at or normalized_at)
+                    tracer.mark(entry_id, 'normalized', normalized_at)
+                    publish_event('fetched', entry_id=entry_id)
+                
                 if new_entries:
                     print("\n" + "-"*60)
                     print(f"FOUND {len(new_entries)} NEW ENTRIES TO PROCESS")
                     print("-"*60)
                     logger.info(f"Found {len(new_entries)} new entries to process")
                     
+                    # A backlog (e.g. after the Pi was offline) is typed back to back
+                    catchup = len(new_entries) >= CATCHUP_THRESHOLD
+                    if catchup:
+                        new_entries = order_backlog(new_entries)
+                        estimate = sum(estimate_entry_seconds(entry, i == 0)
+                                       for i, (entry, _) in enumerate(new_entries))
+                        print(f"CATCH-UP MODE: {len(new_entries)} entries, {CATCHUP_ORDERS[CATCHUP_ORDER]}, "
+                              f"estimated time to drain {format_duration(estimate)}")
+                        logger.info(f"Catch-up mode for {len(new_entries)} entries, "
+                                    f"estimated time to drain {format_duration(estimate)}")
+                        publish_event('catchup', entries=len(new_entries), estimated_seconds=estimate)
+                    drain_start = time.time()
+                    
                     for i, (entry, entry_id) in enumerate(new_entries):
                         print(f"\nPROCESSING ENTRY {i+1} of {len(new_entries)}")
                         logger.info(f"Processing entry {i+1}/{len(new_entries)} with ID: {entry_id}")
                         
-                        # Type this entry's data
-                        type_entry_data(entry)
-                        
-                        # Mark as processed
-                        save_processed_entry(entry_id)
-                        print(f"Entry marked as processed in tracking file")
+                        try:
+                            # Type this entry's data; in catch-up mode focus is already on the app
+                            publish_event('typing', entry_id=entry_id, position=i+1, total=len(new_entries))
+                            audit_begin(entry_id)
+                            type_entry_data(entry, focus_delay=not (catchup and i > 0), entry_id=entry_id)
+                            audit_end(True)
+                            
+                            # Mark as processed
+                            save_processed_entry(entry_id, entry)
+                            print(f"Entry marked as processed in tracking file")
+                            publish_event('typed', entry_id=entry_id)
+                        except Exception as e:
+                            audit_end(False)
+                            publish_event('failed', entry_id=entry_id, error=str(e))
+                            raise
                         
-                        # Add a delay between entries
-                        if i < len(new_entries) - 1:  # Skip delay after last entry
-                            print(f"Waiting {ENTRY_DELAY} seconds before next entry...")
-                            time.sleep(ENTRY_DELAY)
+                        # No extra sleep between entries: type_entry_data() already waits ENTRY_DELAY
+                        if catchup:
+                            # Re-estimate from the measured pace so far
+                            remaining = len(new_entries) - (i + 1)
+                            pace = (time.time() - drain_start) / (i + 1)
+                            print(f"Catch-up progress: {i+1}/{len(new_entries)}, "
+                                  f"about {format_duration(remaining * pace)} remaining")
+                    # Report where the time went for the entries typed so far
+                    latency = tracer.summary()
+                    print("\nLatency by stage (rolling):")
+                    print(format_summary(latency))
+                    tracer.write_stats(LATENCY_STATS_PATH)
+                    publish_event('latency', segments=latency)
                 else:
                     print("\nNo new entries found to process")
                     logger.info("No new entries to process")
@@ -2,7 +2,11 @@
 import time
 import json
 import logging
-from flask import Flask, request, jsonify
+import threading
+from flask import Flask, Response, request, jsonify
+
+from events import EventBroadcaster
+from hid_audit import open_audit_log
 
 # Set up logging
 logging.basicConfig(
@@ -18,11 +22,28 @@ app = Flask(__name__)
 # Keyboard configuration
 NULL_CHAR = chr(0)
 
+# Live event feed configuration
+EVENT_BUFFER_SIZE = 100  # Events buffered per client before it is dropped as too slow
+HEALTH_INTERVAL = 10  # Seconds between health events
+broadcaster = EventBroadcaster(buffer_size=EVENT_BUFFER_SIZE)
+
+# One keyboard: requests are served on several threads, so typing is serialized
+typing_lock = threading.Lock()
+
+# Binary ring log of every HID report sent (decode with hid_audit.py), separate from the
+# sequencer's log; set the path to None to disable
+AUDIT_LOG_PATH = 'keyboard_server_audit.bin'
+AUDIT_LOG_RECORDS = 262144
+hid_audit = None  # Opened when the server starts
+
 def write_report(report):
     """Write a report to the HID device"""
     try:
+        data = report.encode()
         with open('/dev/hidg0', 'rb+') as fd:
-            fd.write(report.encode())
+            fd.write(data)
+        if hid_audit is not None:
+            hid_audit.record(data)
         return True
     except Exception as e:
         logger.error(f"Error writing to HID device: {e}")
@@ -74,23 +95,89 @@ def type_string(text, delay=0.05):
     
     return success
 
+def press_named_key(key):
+    """Press a key by name (e.g. 'enter', 'tab'), key code number or character"""
+    key = key.lower()
+    if key == 'enter':
+        return press_key(40)  # Enter key
+    elif key == 'tab':
+        return press_key(43)  # Tab key
+    elif key == 'space':
+        return press_key(44)  # Space key
+    elif key in ('escape', 'esc'):
+        return press_key(41)  # Escape key
+    elif key == 'backspace':
+        return press_key(42)  # Backspace key
+    elif key.isdigit() and len(key) > 1:
+        return press_key(int(key))  # Raw HID key code
+    else:
+        # Try to handle it as a regular character
+        return press_key(get_key_code(key))
+
+def type_steps(steps):
+    """Run one entry's steps: {'text', 'delay'}, {'key', 'times'} or {'sleep'}"""
+    for step in steps:
+        if 'text' in step:
+            if not type_string(str(step['text']), step.get('delay', 0.05)):
+                return False
+        elif 'key' in step:
+            for _ in range(step.get('times', 1)):
+                if not press_named_key(step['key']):
+                    return False
+                time.sleep(step.get('delay', 0.1))
+        elif 'sleep' in step:
+            time.sleep(step['sleep'])
+    return True
+
 # Server status tracking
 start_time = time.time()
 last_command_time = None
 commands_executed = 0
 
-# API endpoints
-@app.route('/status', methods=['GET'])
-def status():
-    """Return the server status"""
+def get_status():
+    """Build the server status"""
     uptime = time.time() - start_time
-    return jsonify({
+    return {
         'status': 'online',
         'uptime': uptime,
         'uptime_formatted': f"{int(uptime // 3600)}h {int((uptime % 3600) // 60)}m {int(uptime % 60)}s",
         'commands_executed': commands_executed,
-        'last_command_time': last_command_time
-    })
+        'last_command_time': last_command_time,
+        'event_clients': len(broadcaster.subscribers)
+    }
+
+def publish_health():
+    """Periodically publish server health to the event feed"""
+    while True:
+        time.sleep(HEALTH_INTERVAL)
+        broadcaster.publish('health', get_status())
+
+# API endpoints
+@app.route('/status', methods=['GET'])
+def status():
+    """Return the server status"""
+    return jsonify(get_status())
+
+@app.route('/events', methods=['GET'])
+def events():
+    """Stream entry lifecycle and health events as server-sent events"""
+    last_event_id = request.headers.get('Last-Event-ID')
+    subscriber = broadcaster.subscribe(int(last_event_id) if last_event_id and last_event_id.isdigit() else None)
+    return Response(broadcaster.stream(subscriber), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/events/publish', methods=['POST'])
+def publish_event():
+    """Accept an event from a local process (e.g. keyboard_sequence.py) for the feed"""
+    if request.remote_addr not in ('127.0.0.1', '::1'):
+        return jsonify({'success': False, 'error': 'Only local publishers are allowed'}), 403
+
+    data = request.json
+    if not data or 'event' not in data:
+        return jsonify({'success': False, 'error': 'No event provided'}), 400
+
+    broadcaster.publish(data['event'], data.get('data', {}))
+    return jsonify({'success': True})
 
 @app.route('/type', methods=['POST'])
 def type_text():
@@ -107,15 +194,19 @@ def type_text():
         delay = data.get('delay', 0.05)  # Optional delay parameter
         
         logger.info(f"Received type request with text length: {len(text)}")
+        broadcaster.publish('typing', {'length': len(text)})
         
-        success = type_string(text, delay)
+        with typing_lock:
+            success = type_string(text, delay)
         commands_executed += 1
         last_command_time = time.time()
+        broadcaster.publish('typed' if success else 'failed', {'length': len(text)})
         
         return jsonify({'success': success})
     
     except Exception as e:
         logger.error(f"Error processing type request: {e}")
+        broadcaster.publish('failed', {'error': str(e)})
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/keypress', methods=['POST'])
@@ -132,31 +223,67 @@ def keypress():
         key = data['key']
         logger.info(f"Received keypress request for key: {key}")
         
-        # Handle special keys
-        if key == 'enter':
-            success = press_key(40)  # Enter key
-        elif key == 'tab':
-            success = press_key(43)  # Tab key
-        elif key == 'space':
-            success = press_key(44)  # Space key
-        elif key == 'escape':
-            success = press_key(41)  # Escape key
-        elif key == 'backspace':
-            success = press_key(42)  # Backspace key
-        else:
-            # Try to handle it as a regular character
-            success = press_key(get_key_code(key))
+        with typing_lock:
+            success = press_named_key(key)
         
         commands_executed += 1
         last_command_time = time.time()
+        broadcaster.publish('typed' if success else 'failed', {'key': key})
         
         return jsonify({'success': success})
     
     except Exception as e:
         logger.error(f"Error processing keypress request: {e}")
+        broadcaster.publish('failed', {'error': str(e)})
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/sequence', methods=['POST'])
+def sequence():
+    """Type a batch of entries in order, each a list of text/key/sleep steps"""
+    global commands_executed, last_command_time
+    
+    # Counted outside the try so a failure part-way through still reports what was typed
+    typed = 0
+    try:
+        data = request.json
+        
+        if not data or not isinstance(data.get('entries'), list):
+            return jsonify({'success': False, 'error': 'No entries provided', 'typed': 0}), 400
+        
+        entries = data['entries']
+        logger.info(f"Received sequence request with {len(entries)} entries")
+        
+        # Stop at the first failure so the client knows exactly how many entries went through
+        with typing_lock:
+            for entry in entries:
+                entry_id = entry.get('id')
+                broadcaster.publish('typing', {'entry_id': entry_id})
+                if hid_audit is not None:
+                    hid_audit.begin(entry_id)
+                success = False
+                try:
+                    success = type_steps(entry.get('steps', []))
+                finally:
+                    if hid_audit is not None:
+                        hid_audit.end(success)
+                if not success:
+                    broadcaster.publish('failed', {'entry_id': entry_id})
+                    break
+                typed += 1
+                commands_executed += 1
+                last_command_time = time.time()
+                broadcaster.publish('typed', {'entry_id': entry_id})
+        
+        return jsonify({'success': typed == len(entries), 'typed': typed})
+    
+    except Exception as e:
+        logger.error(f"Error processing sequence request after {typed} entries: {e}")
+        broadcaster.publish('failed', {'error': str(e)})
+        return jsonify({'success': False, 'error': str(e), 'typed': typed}), 500
+
 # Run the server
 if __name__ == '__main__':
     logger.info("Starting Raspberry Pi Keyboard Server...")
-    app.run(host='0.0.0.0', port=5000)
\ No newline at end of file
+    hid_audit = open_audit_log(AUDIT_LOG_PATH, AUDIT_LOG_RECORDS)
+    threading.Thread(target=publish_health, daemon=True).start()
+    app.run(host='0.0.0.0', port=5000, threaded=True)
\ No newline at end of file
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# End-to-end load simulation: a local fake Sheets API grows the sheet at a configurable
+# submission rate and burst profile while keyboard_sequence.py types into a virtual HID
+# sink. Time can be compressed with --time-scale; all reported figures are simulated time.
+
+HEADERS = ['Timestamp', '1st entry or 2nd entry', 'Material', 'Party Ref:', 'Gross or Tare',
+           'Save Bill', 'Print', 'Vehicle Number', 'Vehicle Type']
+MATERIALS = ['Sand', 'Steel Bar', 'Gravel', 'Cement', 'Bricks']
+VEHICLES = ['Truck 250', 'Dumper 250', 'RMC TRUCK 250', 'Tractor 150']
+
+class SimClock:
+    """Simulated clock running time_scale times faster than the real one"""
+
+    def __init__(self, time_scale):
+        self.time_scale = time_scale
+        self.real_start = time.time()
+        self.sim_start = self.real_start
+
+    def time(self):
+        """Current simulated time in epoch seconds"""
+        return self.sim_start + (time.time() - self.real_start) * self.time_scale
+
+    def sleep(self, seconds):
+        """Sleep for a simulated duration"""
+        time.sleep(max(0, seconds) / self.time_scale)
+
+    def mktime(self, t):
+        """Same as time.mktime (form timestamps are already in simulated time)"""
+        return time.mktime(t)
+
+class FakeSheet:
+    """A growing form-responses sheet with submission times recorded for each row"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.rows = []
+        self.submitted_at = {}  # Timestamp -> simulated submission time
+        self.last_second = 0
+        self.lock = threading.Lock()
+
+    def submit(self):
+        """Append one truck's form submission"""
+        with self.lock:
+            # Form timestamps have one-second resolution; keep them unique
+            second = max(int(self.clock.time()), self.last_second + 1)
+            self.last_second = second
+            timestamp = datetime.fromtimestamp(second).strftime('%m/%d/%Y %H:%M:%S')
+            n = len(self.rows) + 1
+            self.rows.append([
+                timestamp, random.choice(['1st', '2nd']), random.choice(MATERIALS), f"Party {n}",
+                random.choice(['Gross', 'Tare']), 'Y', 'Y', f"MH12AB{n % 10000:04d}", random.choice(VEHICLES)
+            ])
+            self.submitted_at[timestamp] = second
+
+    def values(self):
+        """Sheet contents in Sheets API 'values' form"""
+        with self.lock:
+            return [HEADERS] + [list(row) for row in self.rows]
+
+def make_handler(sheet, stats):
+    """Build a request handler serving the fake sheet for any values range"""
+    class FakeSheetsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = json.dumps({'values': sheet.values()}).encode()
+            stats['fetches'] += 1
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FakeSheetsHandler
+
+def generate_submissions(sheet, clock, rate, burst_every, burst_size, duration, stop):
+    """Submit forms as a Poisson process at `rate` per hour, plus periodic bursts"""
+    end = clock.time() + duration
+    next_burst = clock.time() + burst_every if burst_every else None
+    while not stop.is_set() and clock.time() < end:
+        wait = random.expovariate(rate / 3600) if rate > 0 else duration
+        if next_burst is not None and clock.time() + wait >= next_burst:
+            clock.sleep(next_burst - clock.time())
+            for _ in range(burst_size):
+                sheet.submit()
+            next_burst += burst_every
+            continue
+        clock.sleep(wait)
+        if clock.time() < end:
+            sheet.submit()
+
+class VirtualHID:
+    """Stands in for /dev/hidg0, counting reports and simulating USB write time"""
+
+    def __init__(self, clock, write_latency):
+        self.clock = clock
+        self.write_latency = write_latency
+        self.reports = 0
+
+    def write_report(self, report):
+        self.reports += 1
+        if self.write_latency:
+            self.clock.sleep(self.write_latency)
+
+def parse_override(text):
+    """Parse a NAME=VALUE override, with VALUE as JSON where possible"""
+    name, _, value = text.partition('=')
+    try:
+        return name, json.loads(value)
+    except ValueError:
+        return name, value
+
+def run(args):
+    """Run one simulation and print a report"""
+    random.seed(args.seed)
+    clock = SimClock(args.time_scale)
+    sheet = FakeSheet(clock)
+    server_stats = {'fetches': 0}
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(sheet, server_stats))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    workdir = tempfile.mkdtemp(prefix='loadsim-')
+
+    # Point the sequencer at the fake API, a scratch tracking CSV and the virtual keyboard
+    import rollups
+    import sheet_cache
+    import tracing
+    rollups.ROLLUPS_DB_PATH = os.path.join(workdir, 'rollups.db')
+    tracing.time = clock
+    sheet_cache.time = clock
+    import keyboard_sequence as ks
+    ks.logger.setLevel(logging.WARNING)
+    ks.SHEETS_API_URL = f"http://127.0.0.1:{server.server_address[1]}/v4/spreadsheets"
+    ks.LOCAL_CSV_PATH = os.path.join(workdir, 'processed.csv')
+    ks.PROCESSED_SNAPSHOT_PATH = os.path.join(workdir, 'processed.snapshot.json')
+    ks.LATENCY_STATS_PATH = os.path.join(workdir, 'latency_stats.json')
+    ks.AUDIT_LOG_PATH = None  # Keep simulated entries out of the real audit log
+    ks.quarantine.path = os.path.join(workdir, 'quarantined.csv')
+    ks.sheet_cache.path = os.path.join(workdir, 'sheet_cache.json')
+    ks.row_tracker.path = os.path.join(workdir, 'rows.json')
+    ks.REVIEW_CSV_PATH = os.path.join(workdir, 'review_changes.csv')
+    ks.event_publisher = None
+    ks.time = clock
+    hid = VirtualHID(clock, args.hid_latency)
+    ks.write_report = hid.write_report
+    for override in args.set:
+        name, value = parse_override(override)
+        if not hasattr(ks, name):
+            sys.exit(f"Unknown keyboard_sequence setting: {name}")
+        setattr(ks, name, value)
+
+    committed = {}  # Timestamp -> simulated commit time
+    save_processed_entry = ks.save_processed_entry
+
+    def record_commit(entry_id, entry=None):
+        save_processed_entry(entry_id, entry)
+        if entry is not None:
+            committed[entry.get('Timestamp')] = clock.time()
+    ks.save_processed_entry = record_commit
+
+    stop = threading.Event()
+    generator = threading.Thread(
+        target=generate_submissions,
+        args=(sheet, clock, args.rate, args.burst_every * 60, args.burst_size, args.duration * 60, stop),
+        daemon=True
+    )
+
+    # The sequencer keeps running until exit, so its console output stays silenced
+    out = sys.stdout
+    if not args.verbose:
+        sys.stdout = open(os.devnull, 'w')
+    threading.Thread(target=ks.main, daemon=True).start()
+    generator.start()
+
+    # Sample the backlog once a simulated minute
+    backlog = []
+    total = (args.duration + args.drain) * 60
+    start = clock.time()
+    while clock.time() - start < total:
+        clock.sleep(60)
+        backlog.append(len(sheet.rows) - len(committed))
+    stop.set()
+
+    waits = sorted(committed[ts] - sheet.submitted_at[ts] for ts in committed if ts in sheet.submitted_at)
+    hours = args.duration / 60
+    typed_in_window = sum(1 for ts in committed if committed[ts] - start <= args.duration * 60)
+    end_of_load = backlog[args.duration - 1] if len(backlog) >= args.duration else '-'
+
+    def report(line=''):
+        print(line, file=out)
+
+    report(f"Simulated {args.duration} min at {args.rate}/h"
+           + (f" with bursts of {args.burst_size} every {args.burst_every} min" if args.burst_every else "")
+           + f" (+{args.drain} min drain, time scale x{args.time_scale})")
+    report(f"  submitted:            {len(sheet.rows)}")
+    report(f"  typed:                {len(committed)}")
+    report(f"  sustained throughput: {typed_in_window / hours:.1f} entries/h")
+    report(f"  backlog:              max {max(backlog, default=0)}, end of load {end_of_load}, "
+           f"final {backlog[-1] if backlog else '-'}")
+    if waits:
+        p95 = waits[min(len(waits) - 1, int(len(waits) * 0.95))]
+        report(f"  time to type:         p50 {statistics.median(waits):.0f}s, p95 {p95:.0f}s, max {waits[-1]:.0f}s")
+    report(f"  HID reports:          {hid.reports}")
+    report(f"  sheet fetches:        {server_stats['fetches']}")
+    report("\nSequencer stage latencies:")
+    report(tracing.format_summary(ks.tracer.summary()))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test keyboard_sequence.py against a fake Sheets API")
+    parser.add_argument("--rate", type=float, default=30, help="Average submissions per hour")
+    parser.add_argument("--burst-every", type=float, default=0, help="Minutes between bursts (0 for none)")
+    parser.add_argument("--burst-size", type=int, default=10, help="Submissions per burst")
+    parser.add_argument("--duration", type=int, default=120, help="Minutes of submissions")
+    parser.add_argument("--drain", type=int, default=30, help="Extra minutes to let the backlog drain")
+    parser.add_argument("--time-scale", type=float, default=60, help="Simulated seconds per real second")
+    parser.add_argument("--hid-latency", type=float, default=0.001, help="Seconds per HID report write")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE",
+                        help="Override a keyboard_sequence setting, e.g. TYPE_DELAY=0.02")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed")
+    parser.add_argument("--verbose", action="store_true", help="Show the sequencer's console output")
+    run(parser.parse_args())
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+import asyncio
+import csv
+import json
+import logging
+import os
+import time
+from urllib.parse import quote
+
+import config
+from sheet_rows import rows_from_values, split_timestamp, split_vehicle_type
+
+logger = logging.getLogger(__name__)
+
+# Multi-site settings (override in config.py). Each source is one spreadsheet with one or
+# more form-response tabs; the default is the single sheet the sequencer uses.
+SHEETS_API_URL = getattr(config, 'SHEETS_API_URL', 'https://sheets.googleapis.com/v4/spreadsheets')
+SHEET_SOURCES = getattr(config, 'SHEET_SOURCES', [
+    {'name': 'default', 'spreadsheet_id': config.SPREADSHEET_ID, 'sheets': [config.SHEET_NAME]},
+])
+SOURCES_STATE_PATH = getattr(config, 'SOURCES_STATE_PATH', 'sources_state.json')
+AGGREGATE_CSV_PATH = getattr(config, 'AGGREGATE_CSV_PATH', 'aggregated_entries.csv')
+ID_FIELDS = getattr(config, 'ID_FIELDS', [])
+CHECK_INTERVAL = getattr(config, 'CHECK_INTERVAL', 10)
+FETCH_TIMEOUT = getattr(config, 'FETCH_TIMEOUT', 30)
+
+def source_namespace(source, sheet):
+    """Namespace that keeps cursors and entry IDs of one site's tab apart from the others"""
+    return f"{source['name']}/{sheet}"
+
+def namespaced_entry_id(namespace, entry):
+    """Entry ID unique across sources"""
+    return namespace + '|' + '|'.join(str(entry.get(field, '')) for field in ID_FIELDS)
+
+def normalize_rows(rows):
+    """Derive Date, Time and Cost in place, as keyboard_sequence.py does, so ID_FIELDS can use them"""
+    if not rows:
+        return rows
+    schema = rows[0].schema  # Rows of one fetch share a schema
+    has_timestamp, has_vehicle_type = 'Timestamp' in schema.index, 'Vehicle Type' in schema.index
+    normalized = schema.extend((['Date', 'Time'] if has_timestamp else []) + (['Cost'] if has_vehicle_type else []))
+    for row in rows:
+        row.schema = normalized
+        if has_timestamp:
+            try:
+                row['Date'], row['Time'] = split_timestamp(row['Timestamp'])
+            except ValueError:
+                row['Date'], row['Time'] = '', ''
+        if has_vehicle_type:
+            row['Cost'], row['Vehicle Type'] = split_vehicle_type(row['Vehicle Type'])
+    return rows
+
+def batch_get_url(source):
+    """values:batchGet URL fetching every tab of a spreadsheet in one request"""
+    ranges = '&'.join(f"ranges={quote(sheet + '!A1:Z')}" for sheet in source['sheets'])
+    return f"{SHEETS_API_URL}/{source['spreadsheet_id']}/values:batchGet?{ranges}&key={config.API_KEY}"
+
+def fetch_source(session, source):
+    """Fetch all tabs of one spreadsheet (blocking); returns {namespace: values}"""
+    response = session.get(batch_get_url(source), timeout=FETCH_TIMEOUT)
+    response.raise_for_status()
+    value_ranges = response.json().get('valueRanges', [])
+    # valueRanges come back in the order the ranges were requested
+    return {source_namespace(source, sheet): value_range.get('values', [])
+            for sheet, value_range in zip(source['sheets'], value_ranges)}
+
+async def fetch_all(session, sources):
+    """Fetch every source concurrently; a failing source does not hold up the others"""
+    results = await asyncio.gather(
+        *(asyncio.to_thread(fetch_source, session, source) for source in sources),
+        return_exceptions=True
+    )
+    values = {}
+    for source, result in zip(sources, results):
+        if isinstance(result, Exception):
+            logger.error(f"Error fetching source {source['name']}: {result}")
+            print(f"ERROR: Could not fetch {source['name']}: {result}")
+            continue
+        values.update(result)
+    return values
+
+class SourceCursors:
+    """Per-namespace row cursors and seen entry IDs, persisted between runs"""
+
+    def __init__(self, path):
+        self.path = path
+        self.cursors = {}
+        try:
+            with open(path, 'r') as f:
+                self.cursors = json.load(f)
+        except (OSError, ValueError):
+            pass
+        self.seen = {}  # namespace -> entry IDs, for dedup when a cursor is missing or reset
+        self.pending = {}  # namespace -> (new cursor, new entry IDs) until the rows are stored
+
+    def new_rows(self, namespace, rows):
+        """Rows past this namespace's cursor that have not been seen before, normalized"""
+        start = self.cursors.get(namespace, 0)
+        if start > len(rows):
+            # Rows were deleted; rescan and rely on the entry IDs to skip known rows
+            logger.warning(f"{namespace} shrank from {start} to {len(rows)} rows, rescanning")
+            start = 0
+        seen = self.seen.get(namespace, set())
+        ids = set()
+        fresh = []
+        for entry in normalize_rows(rows[start:]):
+            entry_id = namespaced_entry_id(namespace, entry)
+            if entry_id not in seen and entry_id not in ids:
+                ids.add(entry_id)
+                fresh.append((entry_id, entry))
+        # Advanced by commit() only once the rows are stored, so a failed append re-reads them
+        self.pending[namespace] = (len(rows), ids)
+        return fresh
+
+    def commit(self):
+        """Advance cursors and seen IDs past the rows returned since the last commit, and save"""
+        for namespace, (cursor, ids) in self.pending.items():
+            self.cursors[namespace] = cursor
+            self.seen.setdefault(namespace, set()).update(ids)
+        self.pending = {}
+        self.save()
+
+    def save(self):
+        """Persist cursors atomically"""
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.cursors, f)
+        os.replace(tmp_path, self.path)
+
+def load_aggregate_ids(path):
+    """Entry IDs already in the aggregate CSV, grouped by namespace"""
+    seen = {}
+    if not os.path.exists(path):
+        return seen
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            seen.setdefault(row.get('Source', ''), set()).add(row.get('Entry ID', ''))
+    return seen
+
+def append_aggregate(path, new_entries):
+    """Append new (namespace, entry_id, entry) rows to the aggregate CSV"""
+    if not new_entries:
+        return
+    file_exists = os.path.exists(path)
+    fieldnames = ['Source', 'Entry ID']
+    if file_exists:
+        with open(path, 'r', newline='', encoding='utf-8') as f:
+            fieldnames = next(csv.reader(f), fieldnames)
+    columns = list(fieldnames)
+    for _, _, entry in new_entries:
+        columns += [key for key in entry.keys() if key not in columns]
+
+    if file_exists and columns != fieldnames:
+        # Sites' forms differ: widen the header instead of dropping the new columns
+        logger.info(f"Adding columns to {path}: {', '.join(columns[len(fieldnames):])}")
+        tmp_path = path + '.tmp'
+        with open(path, 'r', newline='', encoding='utf-8') as f, \
+                open(tmp_path, 'w', newline='', encoding='utf-8') as out:
+            writer = csv.DictWriter(out, fieldnames=columns, restval='')
+            writer.writeheader()
+            writer.writerows(csv.DictReader(f, restval=''))
+        os.replace(tmp_path, path)
+
+    with open(path, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        if not file_exists:
+            writer.writeheader()
+        for namespace, entry_id, entry in new_entries:
+            row = dict(entry.items())
+            row['Source'] = namespace
+            row['Entry ID'] = entry_id
+            writer.writerow(row)
+
+def poll_once(session, cursors, sources=None):
+    """Poll every source once and return new (namespace, entry_id, entry) rows"""
+    values = asyncio.run(fetch_all(session, sources or SHEET_SOURCES))
+    cursors.pending = {}  # Rows of an earlier poll that were never stored are read again
+    new_entries = []
+    for namespace, sheet_values in values.items():
+        for entry_id, entry in cursors.new_rows(namespace, rows_from_values(sheet_values)):
+            new_entries.append((namespace, entry_id, entry))
+    return new_entries
+
+def main():
+    """Aggregate new submissions from every configured site into one CSV"""
+    import requests
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    print(f"Polling {len(SHEET_SOURCES)} spreadsheets every {CHECK_INTERVAL} seconds")
+    for source in SHEET_SOURCES:
+        print(f"  - {source['name']}: {', '.join(source['sheets'])}")
+
+    session = requests.Session()  # Keeps one connection per host open across polls
+    cursors = SourceCursors(SOURCES_STATE_PATH)
+    cursors.seen = load_aggregate_ids(AGGREGATE_CSV_PATH)
+
+    while True:
+        start = time.perf_counter()
+        try:
+            new_entries = poll_once(session, cursors)
+            append_aggregate(AGGREGATE_CSV_PATH, new_entries)
+            cursors.commit()
+            logger.info(f"Polled all sources in {time.perf_counter() - start:.2f}s, "
+                        f"{len(new_entries)} new entries")
+        except Exception as e:
+            logger.error(f"Error polling sources: {e}")
+        time.sleep(CHECK_INTERVAL)
+
+if __name__ == "__main__":
+    main()
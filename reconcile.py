@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+import argparse
+import csv
+import logging
+import os
+import re
+from datetime import datetime
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Reconciliation settings (override in config.py)
+FORM_CSV_PATH = getattr(config, 'FORM_CSV_PATH', 'processed_entries.csv')  # sheets_api.py export, not the sequencer's tracking CSV
+TICKETS_CSV_PATH = getattr(config, 'TICKETS_CSV_PATH', 'extracted_data.csv')
+RECONCILE_REPORT_PATH = getattr(config, 'RECONCILE_REPORT_PATH', 'reconciliation_report.csv')
+VEHICLE_NUMBER_FIELD = getattr(config, 'VEHICLE_NUMBER_FIELD', 'Vehicle Number')
+MATCH_WINDOW_MINUTES = getattr(config, 'MATCH_WINDOW_MINUTES', 120)
+
+REPORT_FIELDS = [
+    'Status', 'Detail', 'Vehicle Number', 'Form Time', 'Ticket Time',
+    'Material', 'Ticket Material', 'Cost', 'Charge (CHG1)', 'S.N'
+]
+
+_NON_ALNUM = re.compile(r'[^A-Z0-9]')
+
+def normalize_vehicle_number(vehicle_number):
+    """Normalize a vehicle number for matching (e.g. 'mh 12-ab 1234' -> 'MH12AB1234')"""
+    return _NON_ALNUM.sub('', (vehicle_number or '').upper())
+
+def parse_form_time(entry):
+    """Get the submission time from a form entry (raw Timestamp or split Date/Time)"""
+    # Timestamp is '%m/%d/%Y %H:%M:%S'; split by hand instead of strptime, which dominates the runtime on a year of rows
+    timestamp = entry.get('Timestamp', '')
+    try:
+        if timestamp:
+            date_part, time_part = timestamp.split(' ')
+            month, day, year = date_part.split('/')
+        else:
+            date_part, time_part = entry.get('Date', ''), entry.get('Time', '')
+            year, month, day = date_part.split('-')
+        hour, minute, second = time_part.split(':')
+        return datetime(int(year), int(month), int(day), int(hour), int(minute), int(second))
+    except ValueError:
+        return None
+
+def parse_ticket_time(ticket):
+    """Get the weighing time from a weighbridge ticket ('%d.%m.%Y,%H:%M')"""
+    value = ticket.get('Date & Time', '')
+    try:
+        date_part, time_part = value.split(',')
+        day, month, year = date_part.split('.')
+        hour, minute = time_part.split(':')
+        return datetime(int(year), int(month), int(day), int(hour), int(minute))
+    except ValueError:
+        return None
+
+def time_bucket(dt, window_seconds):
+    """Map a datetime to its time bucket number"""
+    seconds = dt.toordinal() * 86400 + dt.hour * 3600 + dt.minute * 60 + dt.second
+    return seconds // window_seconds
+
+def load_csv_rows(path):
+    """Load all rows of a CSV file as dictionaries"""
+    if not os.path.exists(path):
+        logger.warning(f"{path} not found, treating it as empty")
+        return []
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f, restval=''))  # Short rows get '' rather than None
+
+def build_ticket_index(tickets, window_seconds):
+    """Index tickets by (normalized vehicle number, time bucket)"""
+    index = {}
+    unkeyed = []
+    for ticket in tickets:
+        vehicle = normalize_vehicle_number(ticket.get('Vehicle Number (V.N)', ''))
+        dt = parse_ticket_time(ticket)
+        if not vehicle or dt is None:
+            unkeyed.append(ticket)
+            continue
+        key = (vehicle, time_bucket(dt, window_seconds))
+        index.setdefault(key, []).append((dt, ticket))
+    return index, unkeyed
+
+def find_ticket(index, vehicle, dt, window_seconds, matched):
+    """Find the closest unmatched ticket for a vehicle within the match window"""
+    bucket = time_bucket(dt, window_seconds)
+    best = None
+    best_gap = None
+    # A ticket within the window can only live in this bucket or a neighbouring one
+    for probe in (bucket - 1, bucket, bucket + 1):
+        for ticket_dt, ticket in index.get((vehicle, probe), ()):
+            if id(ticket) in matched:
+                continue
+            gap = abs((ticket_dt - dt).total_seconds())
+            if gap <= window_seconds and (best_gap is None or gap < best_gap):
+                best, best_gap = (ticket_dt, ticket), gap
+    return best
+
+def costs_match(cost, charge):
+    """Compare the form Cost with the ticket CHG1 value"""
+    try:
+        return float(cost) == float(charge)
+    except (TypeError, ValueError):
+        return False
+
+def report_row(status, detail, entry=None, form_dt=None, ticket=None, ticket_dt=None):
+    """Build a single reconciliation report row"""
+    entry = entry or {}
+    ticket = ticket or {}
+    vehicle = entry.get(VEHICLE_NUMBER_FIELD) or ticket.get('Vehicle Number (V.N)', '')
+    return {
+        'Status': status,
+        'Detail': detail,
+        'Vehicle Number': normalize_vehicle_number(vehicle),
+        'Form Time': form_dt.isoformat(' ') if form_dt else '',
+        'Ticket Time': ticket_dt.isoformat(' ') if ticket_dt else '',
+        'Material': entry.get('Material', ''),
+        'Ticket Material': ticket.get('Material (MATR)', ''),
+        'Cost': entry.get('Cost', ''),
+        'Charge (CHG1)': ticket.get('Charge (CHG1)', ''),
+        'S.N': ticket.get('S.N', ''),
+    }
+
+def reconcile(entries, tickets, window_minutes=None):
+    """Hash-join form entries against weighbridge tickets and return report rows"""
+    window_seconds = (window_minutes or MATCH_WINDOW_MINUTES) * 60
+    index, unkeyed_tickets = build_ticket_index(tickets, window_seconds)
+    matched = set()
+    results = []
+
+    # Oldest submissions claim tickets first so repeat visits pair up in order
+    keyed_entries = []
+    for entry in entries:
+        vehicle = normalize_vehicle_number(entry.get(VEHICLE_NUMBER_FIELD, ''))
+        dt = parse_form_time(entry)
+        if not vehicle or dt is None:
+            detail = 'No vehicle number' if not vehicle else 'Unparseable timestamp'
+            results.append(report_row('missing_ticket', detail, entry, dt))
+            continue
+        keyed_entries.append((dt, vehicle, entry))
+    keyed_entries.sort(key=lambda item: item[0])
+
+    for dt, vehicle, entry in keyed_entries:
+        found = find_ticket(index, vehicle, dt, window_seconds, matched)
+        if found is None:
+            results.append(report_row('missing_ticket', 'No ticket within match window', entry, dt))
+            continue
+        ticket_dt, ticket = found
+        matched.add(id(ticket))
+        if costs_match(entry.get('Cost', ''), ticket.get('Charge (CHG1)', '')):
+            results.append(report_row('matched', '', entry, dt, ticket, ticket_dt))
+        else:
+            detail = f"Cost {entry.get('Cost', '')!r} != CHG1 {ticket.get('Charge (CHG1)', '')!r}"
+            results.append(report_row('cost_mismatch', detail, entry, dt, ticket, ticket_dt))
+
+    for bucket_tickets in index.values():
+        for ticket_dt, ticket in bucket_tickets:
+            if id(ticket) not in matched:
+                results.append(report_row('missing_submission', 'No form entry within match window',
+                                          ticket=ticket, ticket_dt=ticket_dt))
+    for ticket in unkeyed_tickets:
+        results.append(report_row('missing_submission', 'Ticket has no vehicle number or time', ticket=ticket))
+
+    return results
+
+def save_report(results, path=None):
+    """Write reconciliation results to CSV"""
+    path = path or RECONCILE_REPORT_PATH
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+    print(f"Reconciliation report saved to {path}")
+
+def print_summary(results):
+    """Print counts per reconciliation status"""
+    counts = {}
+    for row in results:
+        counts[row['Status']] = counts.get(row['Status'], 0) + 1
+    print("\nRECONCILIATION SUMMARY")
+    for status in ('matched', 'cost_mismatch', 'missing_ticket', 'missing_submission'):
+        print(f"  {status}: {counts.get(status, 0)}")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Reconcile form submissions against weighbridge tickets")
+    parser.add_argument("--form-csv", default=FORM_CSV_PATH, help="CSV of form entries (sheets_api.py output)")
+    parser.add_argument("--tickets-csv", default=TICKETS_CSV_PATH, help="CSV of tickets (eml_extractor.py output)")
+    parser.add_argument("--fetch", action="store_true", help="Fetch form entries live from Google Sheets")
+    parser.add_argument("--window", type=int, default=MATCH_WINDOW_MINUTES, help="Match window in minutes")
+    parser.add_argument("--output", default=RECONCILE_REPORT_PATH, help="Report CSV path")
+    args = parser.parse_args()
+
+    if args.fetch:
+        from sheets_api import get_sheet_data, split_vehicle_type
+        entries = get_sheet_data()
+        for entry in entries:
+            entry['Cost'], entry['Vehicle Type'] = split_vehicle_type(entry.get('Vehicle Type', ''))
+    else:
+        entries = load_csv_rows(args.form_csv)
+    tickets = load_csv_rows(args.tickets_csv)
+
+    start = datetime.now()
+    results = reconcile(entries, tickets, args.window)
+    elapsed = (datetime.now() - start).total_seconds()
+    logger.info(f"Reconciled {len(entries)} entries against {len(tickets)} tickets in {elapsed:.3f}s")
+
+    print_summary(results)
+    save_report(results, args.output)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+import argparse
+import logging
+import sqlite3
+from datetime import datetime
+
+import config
+from reconcile import parse_form_time, parse_ticket_time
+
+logger = logging.getLogger(__name__)
+
+# Rollup settings (override in config.py)
+ROLLUPS_DB_PATH = getattr(config, 'ROLLUPS_DB_PATH', getattr(config, 'ANALYTICS_DB_PATH', 'analytics.db'))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollups (
+    period TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    source TEXT NOT NULL,
+    material TEXT NOT NULL,
+    vehicle_type TEXT NOT NULL,
+    party TEXT NOT NULL,
+    entries INTEGER NOT NULL,
+    net_weight REAL NOT NULL,
+    charges REAL NOT NULL,
+    PRIMARY KEY (period, bucket, source, material, vehicle_type, party)
+);
+CREATE TABLE IF NOT EXISTS rollup_applied (
+    source TEXT NOT NULL,
+    key TEXT NOT NULL,
+    PRIMARY KEY (source, key)
+);
+"""
+
+UPSERT_SQL = """
+INSERT INTO rollups VALUES (?, ?, ?, ?, ?, ?, 1, ?, ?)
+ON CONFLICT (period, bucket, source, material, vehicle_type, party) DO UPDATE SET
+    entries = entries + 1,
+    net_weight = net_weight + excluded.net_weight,
+    charges = charges + excluded.charges
+"""
+
+# Dimensions rollups are keyed by
+DIMENSIONS = ('material', 'vehicle_type', 'party')
+
+# period name -> strftime format of its bucket
+PERIODS = {
+    'hour': '%Y-%m-%d %H:00',
+    'day': '%Y-%m-%d',
+}
+
+_connection = None
+
+def connect(db_path=None):
+    """Open the rollup database, creating tables if needed"""
+    conn = sqlite3.connect(db_path or ROLLUPS_DB_PATH)
+    conn.executescript(SCHEMA)
+    return conn
+
+def get_connection():
+    """Get the shared rollup connection for this process"""
+    global _connection
+    if _connection is None:
+        _connection = connect()
+    return _connection
+
+def to_number(value):
+    """Convert a value to a float, treating blanks and junk as 0"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+def apply(conn, source, key, dt, material, vehicle_type, party, net_weight=0.0, charge=0.0):
+    """Add one row to the hourly and daily rollups, once per (source, key)"""
+    cursor = conn.execute('INSERT OR IGNORE INTO rollup_applied VALUES (?, ?)', (source, key))
+    if cursor.rowcount == 0:
+        return False  # Already counted, e.g. a ticket CSV that was regenerated
+    dimensions = (source, material or '', vehicle_type or '', party or '')
+    for period, bucket_format in PERIODS.items():
+        conn.execute(UPSERT_SQL, (period, dt.strftime(bucket_format)) + dimensions
+                     + (to_number(net_weight), to_number(charge)))
+    return True
+
+def record_entry(entry_id, entry, conn=None):
+    """Update rollups for a typed form entry"""
+    conn = conn or get_connection()
+    try:
+        dt = parse_form_time(entry) or datetime.now()
+        with conn:
+            apply(conn, 'entries', entry_id, dt, entry.get('Material', '').strip(),
+                  entry.get('Vehicle Type', '').strip(), entry.get('Party Ref:', '').strip(),
+                  charge=entry.get('Cost', ''))
+    except sqlite3.Error as e:
+        logger.error(f"Error updating rollups for entry {entry_id}: {e}")
+
+def record_tickets(tickets, conn=None):
+    """Update rollups for extracted weighbridge tickets in a single transaction"""
+    conn = conn or get_connection()
+    added = 0
+    try:
+        with conn:
+            for ticket in tickets:
+                dt = parse_ticket_time(ticket)
+                if dt is None:
+                    continue
+                if apply(conn, 'tickets', ticket['S.N'], dt, ticket.get('Material (MATR)', '').strip(),
+                         ticket.get('Vehicle Type (V.T)', '').strip(), ticket.get('Party (PRTY)', '').strip(),
+                         ticket.get('Net Weight (N/W)', ''), ticket.get('Charge (CHG1)', '')):
+                    added += 1
+    except sqlite3.Error as e:
+        logger.error(f"Error updating rollups for tickets: {e}")
+    return added
+
+def query(conn, period='hour', source='tickets', since=None, group_by=None):
+    """Read rollup rows, optionally summed over all but one dimension"""
+    if group_by is not None and group_by not in DIMENSIONS:
+        raise ValueError(f"Cannot group by {group_by!r}")
+    params = [period, source]
+    where = 'period = ? AND source = ?'
+    if since:
+        where += ' AND bucket >= ?'
+        params.append(since)
+    if group_by:
+        sql = (f"SELECT bucket, {group_by}, SUM(entries), SUM(net_weight), SUM(charges) FROM rollups "
+               f"WHERE {where} GROUP BY bucket, {group_by} ORDER BY bucket, {group_by}")
+    else:
+        sql = (f"SELECT bucket, material, vehicle_type, party, entries, net_weight, charges FROM rollups "
+               f"WHERE {where} ORDER BY bucket, material, vehicle_type, party")
+    return conn.execute(sql, params).fetchall()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show hourly or daily throughput rollups")
+    parser.add_argument("--db", default=ROLLUPS_DB_PATH, help="SQLite database path")
+    parser.add_argument("--period", choices=list(PERIODS), default="hour", help="Rollup period")
+    parser.add_argument("--source", choices=["tickets", "entries"], default="tickets", help="Rollup source")
+    parser.add_argument("--since", help="First bucket to show (e.g. 2025-03-14 or '2025-03-14 09:00')")
+    parser.add_argument("--by", choices=DIMENSIONS, help="Sum over one dimension")
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    for row in query(conn, args.period, args.source, args.since, args.by):
+        print('  '.join('' if v is None else f"{v:.0f}" if isinstance(v, float) else str(v) for v in row))
+    conn.close()
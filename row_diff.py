@@ -0,0 +1,126 @@
+import csv
+import hashlib
+import json
+import os
+from datetime import datetime
+
+# Tracks a content hash per sheet row so edited and deleted submissions can be told apart
+# from new ones. Rows are keyed by form Timestamp (plus an occurrence number for duplicate
+# timestamps) rather than by position, so deleting a row does not make every later row look
+# edited; the position is kept for the review report. Each fetch is diffed against the
+# previous one in a single pass over the current rows.
+
+class RowChanges:
+    """Classification of one fetch against the previous one"""
+
+    def __init__(self):
+        self.keys = []  # Per current row
+        self.hashes = []
+        self.status = []  # Per current row: 'appended', 'edited' or 'unchanged'
+        self.previous_ids = {}  # Row index -> entry ID before an edit
+        self.deleted = []  # (key, previous position, previous entry ID)
+
+    @property
+    def edited(self):
+        return [i for i, status in enumerate(self.status) if status == 'edited']
+
+    @property
+    def appended(self):
+        return [i for i, status in enumerate(self.status) if status == 'appended']
+
+def row_hash(values):
+    """Stable hash of a row's cells (the Sheets API already drops trailing empty cells)"""
+    return hashlib.blake2b('\x1f'.join(values).encode('utf-8'), digest_size=8).hexdigest()
+
+class RowTracker:
+    """Per-row content hashes from the last fetch, persisted between runs"""
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = None  # key -> [position, hash, entry ID]; loaded on first use
+        self.held = None  # Entry IDs of edits held back for review instead of being typed
+
+    def _load(self):
+        self.rows, self.held = {}, set()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            self.rows, self.held = state['rows'], set(state['held'])
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def diff(self, entries):
+        """Classify fetched rows (before normalization) against the previous fetch"""
+        if self.rows is None:
+            self._load()
+        changes = RowChanges()
+        seen = {}
+        for entry in entries:
+            timestamp = entry.get('Timestamp', '')
+            occurrence = seen.get(timestamp, 0)
+            seen[timestamp] = occurrence + 1
+            key = f"{timestamp}#{occurrence}"
+            digest = row_hash(entry.values)
+            changes.keys.append(key)
+            changes.hashes.append(digest)
+
+            previous = self.rows.get(key)
+            if previous is None:
+                changes.status.append('appended')
+            elif previous[1] != digest:
+                changes.status.append('edited')
+                changes.previous_ids[len(changes.status) - 1] = previous[2]
+            else:
+                changes.status.append('unchanged')
+
+        current = set(changes.keys)
+        changes.deleted = [(key, position, entry_id) for key, (position, _, entry_id) in self.rows.items()
+                           if key not in current]
+        return changes
+
+    def commit(self, changes, entry_ids):
+        """Make this fetch the baseline for the next diff and save it atomically"""
+        if not (changes.deleted or any(status != 'unchanged' for status in changes.status)) \
+                and os.path.exists(self.path):
+            return  # Same rows at the same positions as the saved baseline
+        self.rows = {key: [position, digest, entry_id] for position, (key, digest, entry_id)
+                     in enumerate(zip(changes.keys, changes.hashes, entry_ids))}
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'rows': self.rows, 'held': sorted(self.held)}, f, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+
+    def review(self, changes, entry_ids, processed_ids):
+        """Hold back edits of typed rows; returns (change, key, position, previous ID, typed) records"""
+        # An edit of a row already typed (or already held) must not be typed again; an edit of a
+        # row never typed, e.g. a quarantined entry fixed in the sheet, is typed normally
+        records = []
+        for i in changes.edited:
+            previous_id = changes.previous_ids[i]
+            typed = previous_id in processed_ids or previous_id in self.held
+            self.held.discard(previous_id)  # That content is gone from the sheet
+            if typed and entry_ids[i] not in processed_ids:
+                self.held.add(entry_ids[i])
+            records.append(('edited', changes.keys[i], i, previous_id, typed))
+        for key, position, previous_id in changes.deleted:
+            typed = previous_id in processed_ids or previous_id in self.held
+            self.held.discard(previous_id)
+            records.append(('deleted', key, position, previous_id, typed))
+        return records
+
+REVIEW_FIELDNAMES = ['Detected At', 'Change', 'Timestamp', 'Row', 'Previous Entry ID', 'Typed', 'Entry']
+
+def append_review(path, records):
+    """Append (change, key, row position, previous entry ID, typed, entry) records to the review CSV"""
+    if not records:
+        return
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    file_exists = os.path.exists(path)
+    with open(path, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        if not file_exists:
+            writer.writerow(REVIEW_FIELDNAMES)
+        for change, key, position, previous_id, typed, entry in records:
+            writer.writerow([now, change, key.rpartition('#')[0], position + 2,  # Sheet row number (after header)
+                             previous_id or '', 'yes' if typed else 'no',
+                             json.dumps(dict(entry.items()), ensure_ascii=False) if entry is not None else ''])
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+import argparse
+import fcntl
+import json
+import logging
+import os
+import time
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Shared on-disk snapshot of the form sheet for every local reader (keyboard_sequence.py,
+# sheets_api.py, dashboards). Whichever reader finds the snapshot older than the TTL refreshes
+# it under a file lock, so the Sheets API is polled once however many readers there are.
+# Refreshes draw from a token bucket; when it is empty, readers get the cached rows instead.
+# Each change bumps the version, and recent appends are kept as deltas. The rows are only
+# rewritten when they change: the refresh time and the bucket, which change on every refresh,
+# live in a small metadata file next to the snapshot (<path>.meta).
+SHEET_CACHE_PATH = getattr(config, 'SHEET_CACHE_PATH', 'sheet_cache.json')
+SHEET_CACHE_TTL = getattr(config, 'SHEET_CACHE_TTL', 5)  # Seconds a snapshot is served without refetching
+SHEETS_RATE_LIMIT = getattr(config, 'SHEETS_RATE_LIMIT', 30)  # API requests per minute, shared by all readers
+SHEETS_RATE_BURST = getattr(config, 'SHEETS_RATE_BURST', 5)  # Requests allowed back to back
+SHEET_CACHE_DELTAS = getattr(config, 'SHEET_CACHE_DELTAS', 50)  # Versions of appended rows kept
+
+class SheetCache:
+    """Versioned, rate-limited snapshot of one sheet range shared through a file"""
+
+    def __init__(self, path, source, ttl=SHEET_CACHE_TTL, rate_per_minute=SHEETS_RATE_LIMIT,
+                 burst=SHEETS_RATE_BURST, max_deltas=SHEET_CACHE_DELTAS):
+        self.path = path
+        self.source = source  # Identifies the range, e.g. "<spreadsheet id>/<sheet name>"
+        self.ttl = ttl
+        self.rate = rate_per_minute / 60
+        self.burst = burst
+        self.max_deltas = max_deltas
+        self.loaded = None  # Rows file last read by this process, reused until the file is replaced
+        self.loaded_stat = None
+
+    def read_json(self, path):
+        """A cache file's contents for this source, or None"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return data if data.get('source') == self.source else None
+
+    def write_json(self, path, data):
+        """Replace a cache file atomically, so readers never see a partial file"""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    def read(self):
+        """The current snapshot for this source ({'version', 'fetched_at', 'values', ...}), or None"""
+        meta = self.read_json(self.path + '.meta')
+        if meta is None:
+            return None
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        if (stat.st_ino, stat.st_mtime_ns) != self.loaded_stat:
+            self.loaded = self.read_json(self.path)
+            if self.loaded is None:
+                return None
+            self.loaded_stat = (stat.st_ino, stat.st_mtime_ns)
+        snapshot = dict(self.loaded)
+        # Callers normalize rows in place (process_sheet_data); they must never touch the loaded ones
+        snapshot['values'] = [list(row) for row in self.loaded['values']]
+        # The rows are written before the metadata; if a writer died in between, treat them as stale
+        snapshot['fetched_at'] = meta['fetched_at'] if meta['version'] == snapshot['version'] else 0
+        snapshot['bucket'] = meta.get('bucket')
+        return snapshot
+
+    def write(self, snapshot, values_changed=True):
+        """Save the snapshot; the rows file is only rewritten when the rows changed"""
+        if values_changed:
+            self.write_json(self.path, {key: snapshot[key] for key in ('source', 'version', 'values', 'deltas')})
+        self.write_json(self.path + '.meta', {key: snapshot.get(key) for key in
+                                               ('source', 'version', 'fetched_at', 'bucket')})
+
+    def take_token(self, snapshot, now):
+        """Refill the shared bucket and take one token; returns seconds to wait if empty"""
+        if snapshot.get('bucket') is None:
+            snapshot['bucket'] = {'tokens': self.burst, 'refilled_at': now}
+        bucket = snapshot['bucket']
+        bucket['tokens'] = min(self.burst, bucket['tokens'] + (now - bucket['refilled_at']) * self.rate)
+        bucket['refilled_at'] = now
+        if bucket['tokens'] >= 1:
+            bucket['tokens'] -= 1
+            return 0
+        return (1 - bucket['tokens']) / self.rate
+
+    def get(self, fetch):
+        """Latest snapshot ({'version', 'fetched_at', 'values', ...}); fetch() is called if it is stale"""
+        snapshot = self.read()
+        if snapshot is not None and time.time() - snapshot['fetched_at'] < self.ttl:
+            return snapshot
+
+        with open(self.path + '.lock', 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            # Another reader may have refreshed it while we waited for the lock
+            snapshot = self.read()
+            now = time.time()
+            if snapshot is not None and now - snapshot['fetched_at'] < self.ttl:
+                return snapshot
+
+            state = snapshot or {'source': self.source, 'version': 0, 'fetched_at': 0, 'values': [], 'deltas': [],
+                                 'bucket': None}
+            wait = self.take_token(state, now)
+            if wait and snapshot is not None:
+                logger.info(f"Sheets rate limit reached, serving cached version {snapshot['version']}")
+                return snapshot
+            if wait:
+                # Nothing cached yet: wait for quota rather than fail
+                time.sleep(wait)
+                self.take_token(state, time.time())
+
+            try:
+                values = fetch()
+            except Exception as e:
+                if snapshot is None:
+                    raise
+                logger.error(f"Error refreshing sheet cache, serving version {snapshot['version']}: {e}")
+                self.write(state, values_changed=False)  # Keep the spent token
+                return snapshot
+
+            state['fetched_at'] = time.time()
+            changed = values != state['values']
+            if changed:
+                self.add_version(state, values)
+            self.write(state, values_changed=changed or snapshot is None)
+            return state
+
+    def add_version(self, state, values):
+        """Store new values as the next version, recording appended rows as a delta"""
+        old = state['values']
+        state['version'] += 1
+        if old and len(values) >= len(old) and values[:len(old)] == old:
+            delta = {'version': state['version'], 'from_row': len(old) - 1, 'rows': values[len(old):]}
+        else:
+            delta = {'version': state['version'], 'reset': True}  # Rows edited or deleted
+        state['deltas'] = (state['deltas'] + [delta])[-self.max_deltas:]
+        state['values'] = values
+
+    def changes_since(self, version, fetch):
+        """(current version, rows appended since `version`), or rows None if a full reread is needed"""
+        snapshot = self.get(fetch)
+        if version == snapshot['version']:
+            return version, []
+        deltas = [delta for delta in snapshot['deltas'] if delta['version'] > version]
+        if not deltas or deltas[0]['version'] != version + 1 or any(delta.get('reset') for delta in deltas):
+            return snapshot['version'], None
+        return snapshot['version'], [list(row) for delta in deltas for row in delta['rows']]
+
+def fetch_values(url, timeout=30):
+    """Fetch a Sheets API values range (headers first); raises OSError on HTTP and network errors"""
+    # The standard library client: importing requests costs more than the fetch on a cold start
+    from urllib.parse import quote
+    import urllib.request
+
+    # Escape e.g. the spaces in "Form Responses 1" as requests did, leaving the URL's delimiters
+    with urllib.request.urlopen(quote(url, safe="!#$%&'()*+,/:;=?@[]~"), timeout=timeout) as response:
+        return json.loads(response.read()).get('values', [])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show the shared sheet cache")
+    parser.add_argument("--since", type=int, help="Print rows appended since this version")
+    args = parser.parse_args()
+
+    with open(SHEET_CACHE_PATH, 'r', encoding='utf-8') as f:
+        source = json.load(f)['source']
+    snapshot = SheetCache(SHEET_CACHE_PATH, source).read()
+    if snapshot is None:
+        parser.exit(1, f"No sheet cache metadata next to {SHEET_CACHE_PATH}\n")
+    print(f"Source:  {snapshot['source']}")
+    print(f"Version: {snapshot['version']} ({max(0, len(snapshot['values']) - 1)} rows)")
+    print(f"Age:     {time.time() - snapshot['fetched_at']:.1f}s")
+    print(f"Deltas:  versions {', '.join(str(delta['version']) for delta in snapshot['deltas'])}")
+    if args.since is not None:
+        cache = SheetCache(SHEET_CACHE_PATH, snapshot['source'], ttl=float('inf'))
+        version, rows = cache.changes_since(args.since, fetch=lambda: snapshot['values'])
+        print(json.dumps(rows, indent=2) if rows is not None else f"Version {args.since} is too old, reread all rows")
@@ -0,0 +1,112 @@
+from datetime import datetime
+
+class SheetSchema:
+    """Column name -> position map shared by every row of one sheet fetch"""
+
+    __slots__ = ('index', 'width')
+
+    def __init__(self, headers):
+        # Like dict(zip(headers, row)), a repeated header name refers to its last column
+        self.index = {}
+        for position, name in enumerate(headers):
+            self.index[name] = position
+        self.width = len(headers)
+
+    def extend(self, names):
+        """Schema with extra (derived) columns appended after the sheet's own"""
+        schema = SheetSchema.__new__(SheetSchema)
+        schema.index = dict(self.index)
+        schema.width = self.width
+        for name in names:
+            if name not in schema.index:
+                schema.index[name] = schema.width
+                schema.width += 1
+        return schema
+
+class SheetRow:
+    """A sheet row read by column position through a shared schema, with a dict-like interface"""
+
+    __slots__ = ('schema', 'values')
+
+    def __init__(self, schema, values):
+        self.schema = schema
+        self.values = values  # The API's row list, used as is; short rows read as ''
+
+    def __getitem__(self, key):
+        try:
+            return self.values[self.schema.index[key]]
+        except IndexError:
+            return ''
+
+    def get(self, key, default=None):
+        position = self.schema.index.get(key)
+        if position is None:
+            return default
+        try:
+            return self.values[position]
+        except IndexError:
+            return ''
+
+    def __setitem__(self, key, value):
+        position = self.schema.index[key]
+        values = self.values
+        if position >= len(values):
+            values.extend([''] * (position + 1 - len(values)))
+        values[position] = value
+
+    def __contains__(self, key):
+        return key in self.schema.index
+
+    def __iter__(self):
+        return iter(self.schema.index)
+
+    def __len__(self):
+        return len(self.schema.index)
+
+    def keys(self):
+        return self.schema.index.keys()
+
+    def items(self):
+        values = self.values
+        size = len(values)
+        return [(key, values[position] if position < size else '')
+                for key, position in self.schema.index.items()]
+
+    def to_dict(self):
+        """Plain dict copy of the row"""
+        return dict(self.items())
+
+    def __repr__(self):
+        return f"SheetRow({self.to_dict()!r})"
+
+def rows_from_values(values):
+    """Turn a Sheets API 'values' array (headers first) into rows sharing one schema"""
+    if not values:
+        return []
+    schema = SheetSchema(values[0])
+    return [SheetRow(schema, row) for row in values[1:]]
+
+def split_vehicle_type(vehicle_type):
+    """Split Vehicle Type into Cost and Vehicle Type"""
+    # Example: "RMC TRUCK 250" -> Cost = "250", Vehicle Type = "RMC TRUCK"
+    parts = vehicle_type.split()
+    if parts and parts[-1].isdigit():  # Check if the last part is a number
+        cost = parts[-1]
+        vehicle = ' '.join(parts[:-1])  # Join all parts except the last one
+        return cost, vehicle
+    return '', vehicle_type  # If no cost is found, return empty cost and original vehicle type
+
+def split_timestamp(timestamp):
+    """Split a form Timestamp ('%m/%d/%Y %H:%M:%S') into Date and Time strings"""
+    # Parsed by hand: strptime on every row of every fetch dominates a cold start. Not cached, as
+    # every row of the sheet is split each cycle and a cache would hold one entry per row forever
+    try:
+        date_part, time_part = timestamp.split(' ')
+        month, day, year = date_part.split('/')
+        hour, minute, second = time_part.split(':')
+        dt = datetime(int(year), int(month), int(day), int(hour), int(minute), int(second))
+    except ValueError:
+        # Fall back to strptime for anything unusual; it raises if the value is really invalid
+        dt = datetime.strptime(timestamp, '%m/%d/%Y %H:%M:%S')
+    return (f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d}",
+            f"{dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}")
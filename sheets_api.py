@@ -1,35 +1,36 @@
-import requests
 import logging
 import csv
 import os
 import json
 from datetime import datetime
 from config import SPREADSHEET_ID, SHEET_NAME, API_KEY, LOCAL_CSV_PATH
+from sheet_cache import SHEET_CACHE_PATH, SheetCache, fetch_values
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Same shared snapshot keyboard_sequence.py reads, so running both polls the API once
+sheet_cache = SheetCache(SHEET_CACHE_PATH, f"{SPREADSHEET_ID}/{SHEET_NAME}")
+
 def get_sheet_data():
     """Fetch data from Google Sheets API"""
     url = f'https://sheets.googleapis.com/v4/spreadsheets/{SPREADSHEET_ID}/values/{SHEET_NAME}!A1:Z?alt=json&key={API_KEY}'
     
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
+        values = sheet_cache.get(lambda: fetch_values(url))['values']
 
-        if 'values' not in data:
+        if not values:
             logger.warning("No data found in the sheet.")
             return []
         
-        headers = data['values'][0]  # First row as headers
-        rows = data['values'][1:]  # Remaining rows as data
+        headers = values[0]  # First row as headers
+        rows = values[1:]  # Remaining rows as data
 
         entries = [dict(zip(headers, row + [''] * (len(headers) - len(row)))) for row in rows]
         return entries
 
-    except requests.exceptions.RequestException as e:
+    except (OSError, ValueError) as e:
         logger.error(f"Error fetching data from Google Sheets: {e}")
         return []
 
@@ -0,0 +1,47 @@
+import json
+import unittest
+
+from events import EventBroadcaster
+
+def drain(subscriber):
+    events = []
+    while True:
+        event = subscriber.get(0)
+        if event is None:
+            return events
+        events.append(event)
+
+class EventBroadcasterTest(unittest.TestCase):
+    def test_reconnect_after_drop_replays_newest_and_survives_next_publish(self):
+        broadcaster = EventBroadcaster(buffer_size=4, history_size=100)
+        for i in range(6):
+            broadcaster.publish('typed', {'n': i})
+
+        subscriber = broadcaster.subscribe(last_event_id=0)
+        broadcaster.publish('typed', {'n': 6})
+        self.assertFalse(subscriber.closed)
+
+        events = drain(subscriber)
+        self.assertEqual(events[0][:2], (None, 'reset'))
+        self.assertEqual(json.loads(events[0][2]), {'last_event_id': 0, 'missed': 4})
+        self.assertEqual([event[0] for event in events[1:]], [5, 6, 7])
+
+    def test_caught_up_client_gets_no_reset(self):
+        broadcaster = EventBroadcaster(buffer_size=4)
+        broadcaster.publish('typed', {})
+        broadcaster.publish('typed', {})
+        subscriber = broadcaster.subscribe(last_event_id=1)
+        self.assertEqual([event[0] for event in drain(subscriber)], [2])
+
+    def test_dropped_client_is_sent_buffered_events_before_the_stream_ends(self):
+        broadcaster = EventBroadcaster(buffer_size=2)
+        subscriber = broadcaster.subscribe()
+        stream = broadcaster.stream(subscriber, keepalive=0)
+        next(stream)  # retry line
+        for i in range(3):
+            broadcaster.publish('typed', {'n': i})
+        self.assertTrue(subscriber.closed)
+        self.assertEqual([text.split('\n')[0] for text in stream], ['id: 1', 'id: 2'])
+
+if __name__ == '__main__':
+    unittest.main()
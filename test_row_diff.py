@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+
+from row_diff import RowTracker
+from sheet_rows import rows_from_values
+
+HEADERS = ['Timestamp', 'Material', 'Party Ref:']
+
+def fetch(*rows):
+    """Sheet rows as get_sheet_data() returns them"""
+    return rows_from_values([HEADERS] + [list(row) for row in rows])
+
+def entry_ids(entries):
+    return ['|'.join(entry.values) for entry in entries]
+
+class RowTrackerTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'rows.json')
+        self.processed = set()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def cycle(self, *rows, typed=True):
+        """Run one sequencer cycle: diff, review, save, then 'type' the entries not held back"""
+        tracker = RowTracker(self.path)  # Reopened each cycle to cover the saved state
+        entries = fetch(*rows)
+        changes = tracker.diff(entries)
+        ids = entry_ids(entries)
+        records = tracker.review(changes, ids, self.processed)
+        tracker.commit(changes, ids)
+        if typed:
+            self.processed.update(entry_id for entry_id in ids if entry_id not in tracker.held)
+        return changes, records, tracker
+
+    def test_edit_reedit_and_delete_of_typed_row(self):
+        a = ('3/1/2025 10:00:00', 'Sand', 'A')
+        changes, records, _ = self.cycle(a, ('3/1/2025 10:05:00', 'Sand', 'B'))
+        self.assertEqual(changes.appended, [0, 1])
+        self.assertEqual(records, [])
+
+        # A typo fix in a typed row is held, not typed again
+        changes, records, tracker = self.cycle(a, ('3/1/2025 10:05:00', 'Gravel', 'B'))
+        self.assertEqual(changes.edited, [1])
+        self.assertEqual(records, [('edited', '3/1/2025 10:05:00#0', 1, '3/1/2025 10:05:00|Sand|B', True)])
+        self.assertEqual(tracker.held, {'3/1/2025 10:05:00|Gravel|B'})
+        self.assertNotIn('3/1/2025 10:05:00|Gravel|B', self.processed)
+
+        # Editing it again replaces the held ID
+        changes, records, tracker = self.cycle(a, ('3/1/2025 10:05:00', 'Steel', 'B'))
+        self.assertEqual([record[4] for record in records], [True])
+        self.assertEqual(tracker.held, {'3/1/2025 10:05:00|Steel|B'})
+
+        # Unchanged rows stay held across cycles
+        changes, records, tracker = self.cycle(a, ('3/1/2025 10:05:00', 'Steel', 'B'))
+        self.assertEqual(records, [])
+        self.assertNotIn('3/1/2025 10:05:00|Steel|B', self.processed)
+
+        # Deleting the held row reports it as typed and forgets the held ID
+        changes, records, tracker = self.cycle(a)
+        self.assertEqual(records, [('deleted', '3/1/2025 10:05:00#0', 1, '3/1/2025 10:05:00|Steel|B', True)])
+        self.assertEqual(tracker.held, set())
+
+    def test_deleting_earlier_row_does_not_mark_later_rows_edited(self):
+        b = ('3/1/2025 10:05:00', 'Sand', 'B')
+        self.cycle(('3/1/2025 10:00:00', 'Sand', 'A'), b)
+        changes, records, _ = self.cycle(b)
+        self.assertEqual(changes.status, ['unchanged'])
+        self.assertEqual([record[0] for record in records], ['deleted'])
+
+    def test_fixing_quarantined_row_is_typed(self):
+        # A quarantined row was never typed, so fixing it in the sheet must let it through
+        self.cycle(('3/1/2025 10:00:00', '', 'A'), typed=False)
+        changes, records, tracker = self.cycle(('3/1/2025 10:00:00', 'Sand', 'A'))
+        self.assertEqual(records, [('edited', '3/1/2025 10:00:00#0', 0, '3/1/2025 10:00:00||A', False)])
+        self.assertEqual(tracker.held, set())
+        self.assertIn('3/1/2025 10:00:00|Sand|A', self.processed)
+
+if __name__ == '__main__':
+    unittest.main()
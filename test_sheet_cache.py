@@ -0,0 +1,73 @@
+import os
+import sys
+import tempfile
+import types
+import unittest
+
+try:
+    import config
+except ImportError:
+    sys.modules['config'] = types.ModuleType('config')  # sheet_cache only reads optional settings
+
+from sheet_cache import SheetCache
+from sheet_rows import rows_from_values, split_timestamp, split_vehicle_type
+
+HEADERS = ['Timestamp', 'Material', 'Vehicle Type']
+RAW = [HEADERS, ['3/1/2025 10:00:00', 'Sand', 'Truck 250'], ['3/1/2025 10:05:00', 'Gravel', 'RMC TRUCK 300']]
+
+def normalize(values):
+    """Normalize rows in place the way keyboard_sequence.process_sheet_data() does"""
+    rows = rows_from_values(values)
+    schema = rows[0].schema.extend(['Date', 'Time', 'Cost'])
+    for row in rows:
+        row.schema = schema
+        row['Date'], row['Time'] = split_timestamp(row['Timestamp'])
+        row['Cost'], row['Vehicle Type'] = split_vehicle_type(row['Vehicle Type'])
+    return rows
+
+def fetch():
+    return [list(row) for row in RAW]
+
+def fail():
+    raise OSError("Sheets API unreachable")
+
+class SheetCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'sheet_cache.json')
+        self.cache = SheetCache(self.path, 'sheet/Form', ttl=0, rate_per_minute=6000, burst=100)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_failed_refresh_serves_raw_rows(self):
+        for _ in range(2):  # The second refresh serves rows this process loaded from the file
+            normalize(self.cache.get(fetch)['values'])
+        snapshot = self.cache.get(fail)
+        self.assertEqual(snapshot['values'], RAW)
+        self.assertEqual(snapshot['version'], 1)
+
+    def test_unchanged_sheet_keeps_version_and_rows_file(self):
+        normalize(self.cache.get(fetch)['values'])
+        written = os.stat(self.path).st_mtime_ns
+        for _ in range(3):
+            normalize(self.cache.get(fetch)['values'])
+        self.assertEqual(self.cache.read()['version'], 1)
+        self.assertEqual(os.stat(self.path).st_mtime_ns, written)
+
+    def test_appended_rows_are_a_delta(self):
+        normalize(self.cache.get(fetch)['values'])
+        rows = RAW + [['3/1/2025 10:07:00', 'Sand', 'Dumper 250']]
+        self.cache.get(lambda: [list(row) for row in rows])
+        self.assertEqual(self.cache.changes_since(1, fetch=fail), (2, [rows[-1]]))
+
+    def test_rate_limited_refresh_serves_raw_rows(self):
+        cache = SheetCache(self.path, 'sheet/Form', ttl=0, rate_per_minute=1, burst=2)
+        for _ in range(2):
+            normalize(cache.get(fetch)['values'])
+        snapshot = cache.get(fail)  # No token left, so the cached rows are served without fetching
+        self.assertEqual(snapshot['values'], RAW)
+        self.assertEqual(snapshot['version'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
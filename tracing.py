@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+import json
+import logging
+import os
+import sys
+import time
+from bisect import bisect_left
+from collections import deque
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Latency segments as (name, from stage, to stage); stages in pipeline order are
+# submitted, seen, normalized, typing_started, typing_finished, settled (after ENTRY_DELAY),
+# committed
+SEGMENTS = (
+    ('poll', 'submitted', 'seen'),
+    ('normalize', 'seen', 'normalized'),
+    ('queue', 'normalized', 'typing_started'),
+    ('typing', 'typing_started', 'typing_finished'),
+    ('settle', 'typing_finished', 'settled'),
+    ('commit', 'settled', 'committed'),
+    ('total', 'submitted', 'committed'),
+)
+
+# Histogram bucket upper bounds in seconds
+BUCKET_BOUNDS = (0.1, 0.5, 1, 2, 5, 10, 30, 60, 120, 300, 600, 1800, 3600, float('inf'))
+
+def parse_form_timestamp(timestamp):
+    """Convert a form Timestamp to epoch seconds (assumes the sheet and Pi share a timezone)"""
+    try:
+        return time.mktime(datetime.strptime(timestamp, '%m/%d/%Y %H:%M:%S').timetuple())
+    except (TypeError, ValueError):
+        return None
+
+class LatencyHistogram:
+    """Bucketed latency counts plus a rolling window of recent samples for percentiles"""
+
+    def __init__(self, window=500):
+        self.counts = [0] * len(BUCKET_BOUNDS)
+        self.samples = deque(maxlen=window)
+        self.count = 0
+
+    def add(self, seconds):
+        """Record one latency sample"""
+        self.counts[bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.samples.append(seconds)
+        self.count += 1
+
+    def percentile(self, sorted_samples, pct):
+        """Nearest-rank percentile of already sorted samples"""
+        if not sorted_samples:
+            return None
+        rank = max(0, min(len(sorted_samples) - 1, int(round(pct / 100 * len(sorted_samples))) - 1))
+        return sorted_samples[rank]
+
+    def summary(self):
+        """Summarize the rolling window and all-time buckets"""
+        ordered = sorted(self.samples)
+        return {
+            'count': self.count,
+            'p50': self.percentile(ordered, 50),
+            'p95': self.percentile(ordered, 95),
+            'p99': self.percentile(ordered, 99),
+            'buckets': {f"<={bound:g}s": n for bound, n in zip(BUCKET_BOUNDS, self.counts) if n},
+        }
+
+class LatencyTracer:
+    """Track per-entry stage timestamps and feed completed traces into per-segment histograms"""
+
+    def __init__(self, window=500):
+        self.traces = {}  # entry ID -> {stage: epoch seconds}
+        self.histograms = {name: LatencyHistogram(window) for name, _, _ in SEGMENTS}
+
+    def mark(self, key, stage, when=None):
+        """Record when an entry first reached a stage"""
+        if not key:
+            return
+        trace = self.traces.setdefault(key, {})
+        if stage not in trace:
+            trace[stage] = time.time() if when is None else when
+
+    def discard(self, key):
+        """Forget an entry that does not need tracing (e.g. already processed)"""
+        self.traces.pop(key, None)
+
+    def complete(self, key, timestamp=None):
+        """Finish an entry's trace and add its segment latencies to the histograms"""
+        trace = self.traces.pop(key, None)
+        if not trace:
+            return None
+        # The form Timestamp is parsed only once the entry is done
+        submitted = parse_form_timestamp(timestamp)
+        if submitted is not None:
+            trace['submitted'] = submitted
+        for name, start, end in SEGMENTS:
+            if start in trace and end in trace and trace[end] >= trace[start]:
+                self.histograms[name].add(trace[end] - trace[start])
+        return trace
+
+    def summary(self):
+        """Rolling p50/p95/p99 per segment"""
+        return {name: histogram.summary() for name, histogram in self.histograms.items()}
+
+    def write_stats(self, path):
+        """Write the current summary to a JSON file for monitoring tools"""
+        try:
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump({'updated': time.time(), 'segments': self.summary()}, f, indent=2)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write latency stats to {path}: {e}")
+
+def format_summary(summary):
+    """Format a tracer summary as a table"""
+    lines = [f"{'segment':10s} {'count':>6s} {'p50':>9s} {'p95':>9s} {'p99':>9s}"]
+    for name, _, _ in SEGMENTS:
+        stats = summary.get(name, {})
+        cells = ['-' if stats.get(p) is None else f"{stats[p]:.2f}s" for p in ('p50', 'p95', 'p99')]
+        lines.append(f"{name:10s} {stats.get('count', 0):6d} {cells[0]:>9s} {cells[1]:>9s} {cells[2]:>9s}")
+    return '\n'.join(lines)
+
+if __name__ == "__main__":
+    # Print the stats file written by keyboard_sequence.py
+    path = sys.argv[1] if len(sys.argv) > 1 else 'latency_stats.json'
+    with open(path, 'r') as f:
+        stats = json.load(f)
+    print(f"Updated {datetime.fromtimestamp(stats['updated']):%Y-%m-%d %H:%M:%S}")
+    print(format_summary(stats['segments']))
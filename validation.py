@@ -0,0 +1,108 @@
+import csv
+import json
+import os
+import re
+from datetime import datetime
+
+# Validation rules map a field to checks, applied to entries after process_sheet_data():
+#   required     the value must not be empty
+#   pattern      the whole value must match this regular expression (ignore_case: True to relax)
+#   choices      the value must be one of these
+#   max_length   the value must be at most this many characters
+#   numeric      the value, if present, must be a number
+#   message      reason recorded instead of the generated one
+# e.g. in config.py:
+#   VALIDATION_RULES = {
+#       'Material': {'required': True},
+#       'Vehicle Number': {'required': True, 'pattern': r'[A-Z]{2} ?\d{1,2} ?[A-Z]{0,3} ?\d{4}', 'ignore_case': True},
+#       '1st entry or 2nd entry': {'choices': ['1st', '2nd']},
+#   }
+DEFAULT_RULES = {
+    'Timestamp': {'required': True},
+    'Date': {'required': True, 'message': 'Timestamp could not be parsed'},  # Set by process_sheet_data
+    'Material': {'required': True},
+}
+
+RULE_KEYS = {'required', 'pattern', 'ignore_case', 'choices', 'max_length', 'numeric', 'message'}
+
+def is_number(value):
+    try:
+        float(value)
+        return True
+    except ValueError:
+        return False
+
+def compile_rules(rules):
+    """Turn rule specs into a flat list of (field, check, reason) with patterns compiled once"""
+    checks = []
+    for field, rule in rules.items():
+        unknown = set(rule) - RULE_KEYS
+        if unknown:
+            raise ValueError(f"Unknown validation rule(s) for {field}: {', '.join(sorted(unknown))}")
+        message = rule.get('message')
+
+        # Checks receive the value as a stripped string and return True when it passes
+        if rule.get('required'):
+            checks.append((field, bool, message or f"{field} is empty"))
+        if 'pattern' in rule:
+            regex = re.compile(rule['pattern'], re.IGNORECASE if rule.get('ignore_case') else 0)
+            checks.append((field, lambda value, fullmatch=regex.fullmatch: not value or fullmatch(value),
+                           message or f"{field} does not match the expected format"))
+        if 'choices' in rule:
+            choices = frozenset(rule['choices'])
+            checks.append((field, lambda value, choices=choices: not value or value in choices,
+                           message or f"{field} must be one of: {', '.join(rule['choices'])}"))
+        if 'max_length' in rule:
+            limit = rule['max_length']
+            checks.append((field, lambda value, limit=limit: len(value) <= limit,
+                           message or f"{field} is longer than {limit} characters"))
+        if rule.get('numeric'):
+            checks.append((field, lambda value: not value or is_number(value),
+                           message or f"{field} is not a number"))
+    return checks
+
+class Validator:
+    """Checks entries against compiled rules before they are typed"""
+
+    def __init__(self, rules):
+        self.checks = compile_rules(rules)
+
+    def validate(self, entry):
+        """Return the reasons an entry is invalid (empty if it is fine)"""
+        reasons = []
+        for field, check, reason in self.checks:
+            value = entry.get(field)
+            if not check(str(value).strip() if value is not None else ''):
+                reasons.append(reason)
+        return reasons
+
+class Quarantine:
+    """CSV of entries held back from typing, with the reasons, recorded once per entry ID"""
+
+    FIELDNAMES = ['Quarantined At', 'Entry ID', 'Reasons', 'Entry']
+
+    def __init__(self, path):
+        self.path = path
+        self.ids = None  # Loaded on first use
+
+    def _load(self):
+        self.ids = set()
+        if os.path.exists(self.path):
+            with open(self.path, 'r', newline='', encoding='utf-8') as f:
+                self.ids.update(row['Entry ID'] for row in csv.DictReader(f))
+
+    def add(self, entry_id, entry, reasons):
+        """Record an entry; returns False if it was already quarantined"""
+        if self.ids is None:
+            self._load()
+        if entry_id in self.ids:
+            return False
+        self.ids.add(entry_id)
+        file_exists = os.path.exists(self.path)
+        with open(self.path, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            if not file_exists:
+                writer.writerow(self.FIELDNAMES)
+            writer.writerow([datetime.now().strftime('%Y-%m-%d %H:%M:%S'), entry_id, '; '.join(reasons),
+                             json.dumps(dict(entry.items()), ensure_ascii=False)])
+        return True